@@ -0,0 +1,423 @@
+"""Perhitungan analisis dashboard tanpa Streamlit.
+
+Semua fungsi analisis menerima Dataset dan FilterSpec, lalu mengembalikan
+DataFrame hasil agregasi berukuran kecil. Modul ini dipakai oleh dashboard,
+oleh server JSON (api.py), maupun oleh job pelaporan lain.
+"""
+import functools
+import os
+import threading
+from dataclasses import dataclass
+
+import pandas as pd
+
+from columnar_cache import Source, source_signature
+from cube import CUBE_MEASURES, build_cube, cube_mean, cube_sum, replace_from
+from features import BASE_YEAR, derive_features
+from filters import FilterIndex
+from ingest import (
+    DAY_DTYPES, HOUR_DTYPES, OutOfOrderError, check_order, complete_size, prefix_digest,
+    read_range, rollup_daily, touched_hours,
+)
+from moments import correlation, merge_moments, stddev
+from partitions import aggregate_partitions, find_partitions, partitions_version
+from pipeline import clean, load_frames
+from rolling import LiveAnomalies
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR_ENV = 'DASHBOARD_DATA_DIR'
+ENGINE_ENV = 'DASHBOARD_ENGINE'
+CORRELATION_COLS = ['temp', 'atemp', 'hum', 'windspeed', 'cnt']
+
+
+def find_csv(name):
+    # CSV dicari di direktori dashboard terlebih dahulu, lalu di direktori dataset
+    candidates = [
+        os.path.join(BASE_DIR, name),
+        os.path.join(BASE_DIR, "..", "dataset", name),
+    ]
+    csv_path = next((path for path in candidates if os.path.exists(path)), None)
+    if csv_path is None:
+        raise FileNotFoundError(f"File {name} tidak ditemukan!")
+    return csv_path
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    # Spesifikasi filter; nilai kosong/None berarti tidak difilter
+    start_date: object = None
+    end_date: object = None
+    seasons: tuple = ()
+    weathers: tuple = ()
+    workingday: object = None
+    hours: object = None
+
+    @classmethod
+    def from_params(cls, params):
+        # Membentuk FilterSpec dari parameter query string, misalnya
+        # ?start_date=2011-01-01&seasons=1,2&workingday=1&hours=7,9
+        def codes(key):
+            value = params.get(key)
+            return tuple(int(code) for code in value.split(',') if code) if value else ()
+
+        workingday = params.get('workingday')
+        hours = codes('hours')
+        return cls(
+            start_date=params.get('start_date') or None,
+            end_date=params.get('end_date') or None,
+            seasons=codes('seasons'),
+            weathers=codes('weathers'),
+            workingday=int(workingday) if workingday not in (None, '') else None,
+            hours=(hours[0], hours[-1]) if hours else None,
+        )
+
+    def mask_args(self):
+        return dict(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            season=self.seasons,
+            weathersit=self.weathers,
+            workingday=None if self.workingday is None else [self.workingday],
+        )
+
+
+ALL = FilterSpec()
+
+
+class Dataset:
+    # Data baris (dengan kolom turunan), kubus agregat, dan indeks filter untuk
+    # satu granularitas. Hasil filter terakhir disimpan agar beberapa analisis
+    # dengan filter yang sama tidak menghitung mask berulang kali.
+    # Dataset tidak pernah diubah; append() mengembalikan Dataset baru.
+
+    def __init__(self, rows, cube, hour_cube=None, source=None, open_hours=None, version=None):
+        self.rows = rows
+        self.cube = cube
+        self.hour_cube = hour_cube
+        self.source = source
+        # Baris per jam dari hari terakhir, yang mungkin baru sebagian jamnya
+        # dimuat; diperlukan untuk menghitung ulang total harian hari tersebut
+        self.open_hours = open_hours
+        self._version = version
+        self.row_index = FilterIndex(rows)
+        self.cube_index = FilterIndex(cube)
+        self.hour_cube_index = None
+        if hour_cube is not None:
+            self.hour_cube_index = FilterIndex(hour_cube, columns=('season', 'weathersit', 'workingday', 'hr'))
+        self.filtered_rows = functools.lru_cache(maxsize=16)(self._filtered_rows)
+        self.filtered_cube = functools.lru_cache(maxsize=16)(self._filtered_cube)
+        self.filtered_hour_cube = functools.lru_cache(maxsize=16)(self._filtered_hour_cube)
+
+    @property
+    def hourly(self):
+        return self.hour_cube is not None
+
+    @property
+    def version(self):
+        # Berubah setiap kali isi data sumber berubah; dipakai sebagai bagian key
+        # cache, termasuk cache bersama antarproses/replika
+        return self._version if self.source is None else self.source.version
+
+    def append(self, new_rows, source=None):
+        # Menambahkan baris baru (harian, atau per jam pada dataset per jam). Hanya
+        # hari-hari yang tersentuh data baru yang diagregasi ulang; baris dan sel
+        # kubus sebelumnya dipakai apa adanya.
+        new_rows = clean(new_rows, existing=self.open_hours)
+        if new_rows.empty:
+            return self
+        if self.hourly:
+            hours = touched_hours(self.open_hours, new_rows)
+            start = hours['date'].iloc[0]
+            new_days = rollup_daily(hours)
+            cut = self.rows['date'].searchsorted(start)
+            new_days['instant'] = (new_days['instant'] + cut).astype('int32')
+            hour_cube = replace_from(self.hour_cube, start, build_cube(hours, extra_keys=['hr']))
+            open_hours = hours[hours['date'] == hours['date'].iloc[-1]]
+        else:
+            check_order(self.rows, new_rows)
+            new_days = new_rows
+            start = new_days['date'].min()
+            cut = self.rows['date'].searchsorted(start)
+            hour_cube = None
+            open_hours = None
+        rows = pd.concat([self.rows.iloc[:cut], derive_features(new_days)], ignore_index=True)
+        cube = replace_from(self.cube, start, build_cube(new_days, moments=True))
+        return Dataset(rows, cube, hour_cube, source=source or self.source, open_hours=open_hours)
+
+    def row_mask(self, spec):
+        return self.row_index.mask(**spec.mask_args())
+
+    def _filtered_rows(self, spec):
+        return self.rows[self.row_mask(spec)]
+
+    def _filtered_cube(self, spec):
+        return self.cube[self.cube_index.mask(**spec.mask_args())]
+
+    def _filtered_hour_cube(self, spec):
+        hours = None
+        if spec.hours is not None:
+            hours = list(range(spec.hours[0], spec.hours[1] + 1))
+        return self.hour_cube[self.hour_cube_index.mask(hr=hours, **spec.mask_args())]
+
+
+def load_dataset(granularity='daily', data_dir=None, engine=None):
+    # granularity: 'daily' memakai day.csv, 'hourly' memakai hour.csv beserta
+    # total harian yang dihitung saat membaca hour.csv.
+    # data_dir (atau variabel lingkungan DASHBOARD_DATA_DIR): direktori berisi
+    # banyak file partisi (per tahun/bulan/stasiun) yang diagregasi paralel.
+    # engine (atau DASHBOARD_ENGINE): 'pandas' (default), atau 'duckdb' untuk
+    # data yang lebih besar dari memori (lihat sqlengine.py).
+    data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+    engine = engine or os.environ.get(ENGINE_ENV) or 'pandas'
+    if engine == 'duckdb':
+        # DuckDB bersifat opsional dan hanya diimpor jika engine ini dipilih
+        from sqlengine import load_sql_dataset
+        return load_sql_dataset(granularity, data_dir)
+    if engine != 'pandas':
+        raise ValueError(f"Engine tidak dikenal: {engine}")
+    if data_dir:
+        paths = find_partitions(data_dir, granularity)
+        rows, cube, hour_cube = aggregate_partitions(paths, granularity)
+        return Dataset(rows, cube, hour_cube, version=partitions_version(paths))
+
+    csv_path = find_csv("hour.csv" if granularity == 'hourly' else "day.csv")
+    # Hasil antara (baris bersih dan kubus) dibaca dari cache Feather pipeline
+    stages = load_frames(csv_path, granularity)
+    source = stages.source
+    if stages.hourly is None:
+        return Dataset(derive_features(stages.daily), stages.cube, source=source)
+    hour_df = stages.hourly
+    open_hours = hour_df.iloc[hour_df['date'].searchsorted(hour_df['date'].iloc[-1]):]
+    return Dataset(derive_features(stages.daily), stages.cube, stages.hour_cube, source=source, open_hours=open_hours)
+
+
+def refresh_dataset(ds):
+    # Membaca baris yang ditambahkan ke CSV sumber sejak ds dimuat. Parsing dan
+    # agregasi sebanding dengan jumlah baris baru; yang tetap O(ukuran file)
+    # hanyalah satu kali hash byte lama untuk memastikan isinya tidak berubah,
+    # dan state hash tersebut dilanjutkan dengan byte baru untuk fingerprint
+    # berikutnya. Mengembalikan ds itu sendiri jika tidak ada baris baru, atau
+    # dataset yang dimuat ulang penuh jika isi lama file ternyata berubah.
+    source = ds.source
+    if source is None:
+        # Dataset dari direktori partisi dimuat ulang lewat load_dataset;
+        # SqlDataset selalu membaca isi file terbaru
+        return ds
+    # Signature diambil sebelum offset, seperti pada columnar_cache.load_with_cache
+    signature = source_signature(source.csv_path)
+    end = complete_size(source.csv_path)
+    granularity = 'hourly' if ds.hourly else 'daily'
+    if end == source.offset:
+        # Tidak ada byte baru: jika signature tetap, file tidak berubah; jika
+        # berubah, isi lama diedit di tempat tanpa mengubah ukuran file
+        if signature == source.signature:
+            return ds
+        return load_dataset(granularity)
+    if end < source.offset:
+        return load_dataset(granularity)
+    digest = prefix_digest(source.csv_path, source.offset)
+    if digest.hexdigest() != source.fingerprint:
+        return load_dataset(granularity)
+    new_rows = read_range(source.csv_path, HOUR_DTYPES if ds.hourly else DAY_DTYPES, source.offset, end)
+    fingerprint = prefix_digest(source.csv_path, end, source.offset, digest).hexdigest()
+    try:
+        return ds.append(new_rows, source=Source(source.csv_path, end, fingerprint, signature))
+    except OutOfOrderError:
+        return load_dataset(granularity)
+
+
+class LiveDataset:
+    # Dataset yang mengikuti CSV sumber yang terus bertambah. refresh() aman
+    # dipanggil dari beberapa thread sekaligus; pembaca selalu mendapat Dataset
+    # yang utuh karena Dataset lama tidak pernah diubah.
+
+    def __init__(self, granularity='daily'):
+        self.current = load_dataset(granularity)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            self.current = refresh_dataset(self.current)
+        return self.current
+
+
+# --- Tren dan faktor yang memengaruhi peminjaman ---
+
+def daily_totals(ds, spec=ALL, measures=('cnt',)):
+    return cube_sum(ds.filtered_cube(spec), 'date', list(measures))
+
+
+def daily_anomalies(ds, spec=ALL, window=28, method='zscore', threshold=3.0, quantiles=(0.1, 0.9)):
+    # Statistik bergulir (rata-rata, simpangan baku, median, kuantil, MAD) dan
+    # penanda anomali untuk total harian casual, registered, dan cnt. window
+    # dihitung dalam baris, yaitu hari yang lolos filter (lihat rolling.py).
+    tracker = LiveAnomalies(CUBE_MEASURES, window, method=method, threshold=threshold, quantiles=quantiles)
+    return tracker.update(daily_totals(ds, spec, CUBE_MEASURES))
+
+
+def seasonal_means(ds, spec=ALL):
+    return cube_mean(ds.filtered_cube(spec), 'season', ['cnt'])
+
+
+def weather_means(ds, spec=ALL):
+    return cube_mean(ds.filtered_cube(spec), 'weathersit', ['cnt'])
+
+
+def workingday_means(ds, spec=ALL):
+    return segment_means(user_segments(ds, spec), 'workingday', ['cnt'])
+
+
+# --- Pola per jam (hanya untuk dataset per jam) ---
+
+def hourly_means(ds, spec=ALL):
+    return cube_mean(ds.filtered_hour_cube(spec), ['workingday', 'hr'], ['cnt'])
+
+
+def hourly_user_type_means(ds, spec=ALL):
+    return cube_mean(ds.filtered_hour_cube(spec), 'hr', ['casual', 'registered'])
+
+
+# --- Perbandingan tipe pengguna ---
+
+def user_segments(ds, spec=ALL):
+    # Tabel segmen pengguna: jumlah casual, registered, cnt, dan banyak hari per
+    # (workingday, weekday), paling banyak 14 baris. Dihitung sekali per filter;
+    # rata-rata per jenis hari, per hari dalam seminggu, maupun proporsi tipe
+    # pengguna semuanya diturunkan dari tabel ini dengan segment_means.
+    sum_cols = [f'{m}_sum' for m in CUBE_MEASURES]
+    segments = ds.filtered_cube(spec).groupby(['workingday', 'weekday'], sort=True)[sum_cols + ['n']].sum()
+    return segments.reset_index()
+
+
+def segment_means(segments, by, measures=('casual', 'registered')):
+    # Rata-rata per hari dari tabel user_segments, dikelompokkan menurut `by`
+    return cube_mean(segments, by, list(measures))
+
+
+def user_type_means(ds, spec=ALL):
+    # Rata-rata casual dan registered per jenis hari (format lebar)
+    return segment_means(user_segments(ds, spec), 'workingday')
+
+
+def user_type_comparison(ds, spec=ALL):
+    # Format panjang (workingday, User Type, Count); hanya untuk klien API,
+    # dashboard menggambar langsung dari format lebar
+    return user_type_means(ds, spec).melt(
+        id_vars=['workingday'],
+        value_vars=['casual', 'registered'],
+        var_name='User Type',
+        value_name='Count'
+    )
+
+
+def weekday_user_type_means(ds, spec=ALL):
+    return segment_means(user_segments(ds, spec), 'weekday')
+
+
+# --- Pengaruh faktor cuaca ---
+
+def correlation_matrix(ds, spec=ALL, columns=CORRELATION_COLS):
+    # Korelasi dari momen sel kubus yang lolos filter, tanpa membaca baris mentah;
+    # columns boleh berisi kolom mana pun dari moments.MOMENT_COLS
+    stats = merge_moments(ds.filtered_cube(spec), columns=columns).iloc[0]
+    return correlation(stats, columns)
+
+
+# --- Tren musiman dan pertumbuhan tahunan ---
+
+def _relative_year_means(ds, spec, by):
+    cube = ds.filtered_cube(spec)
+    cube = cube.assign(year=cube['year'] - BASE_YEAR)  # 0 untuk 2011, 1 untuk 2012
+    return cube_mean(cube, ['year', by], ['cnt']).rename(columns={'cnt': 'total_count'})
+
+
+def monthly_means(ds, spec=ALL):
+    return _relative_year_means(ds, spec, 'month')
+
+
+def quarterly_means(ds, spec=ALL):
+    return _relative_year_means(ds, spec, 'quarter')
+
+
+def weekday_year_means(ds, spec=ALL):
+    return _relative_year_means(ds, spec, 'weekday')
+
+
+# --- Segmentasi dan perilaku pengguna ---
+
+def casual_ratio_series(ds, spec=ALL):
+    return ds.filtered_rows(spec)[['date', 'casual_ratio']]
+
+
+def seasonal_segment(ds, spec=ALL, user_type='casual'):
+    # Rata-rata per musim (baris) dan jenis hari (kolom) untuk satu tipe pengguna
+    means = cube_mean(ds.filtered_cube(spec), ['season', 'workingday'], [user_type])
+    return means.pivot(index='season', columns='workingday', values=user_type)
+
+
+def weather_elasticity(ds, spec=ALL):
+    return cube_mean(ds.filtered_cube(spec), 'weathersit').set_index('weathersit')
+
+
+def weather_pct_change(ds, spec=ALL):
+    # Persentase perubahan peminjaman saat kondisi cuaca memburuk satu tingkat
+    return weather_elasticity(ds, spec).pct_change() * 100
+
+
+def monthly_volatility(ds, spec=ALL):
+    # Rata-rata dan simpangan baku harian per bulan dari momen sel kubus
+    stats = merge_moments(ds.filtered_cube(spec), ['year', 'month'], columns=['cnt'])
+    # Dibentuk lewat to_datetime agar juga berjalan pada pandas < 2.2 (versi
+    # yang dipasang notebook), yang belum memiliki PeriodIndex.from_fields
+    month_year = pd.PeriodIndex(pd.to_datetime(pd.DataFrame({
+        'year': stats.index.get_level_values('year').to_numpy(),
+        'month': stats.index.get_level_values('month').to_numpy(),
+        'day': 1,
+    })).dt.to_period('M'), name='month_year')
+    volatility = pd.DataFrame({'mean': stats['cnt_mean'].to_numpy(), 'std': stddev(stats, 'cnt').to_numpy()}, index=month_year)
+    volatility['cv'] = volatility['std'] / volatility['mean'] * 100  # Coefficient of variation
+    return volatility
+
+
+def casual_ratio_stats(ds, spec=ALL, by='season'):
+    # Rata-rata, simpangan baku, dan CV rasio casual harian per kelompok, serta
+    # porsi casual dari total peminjaman (jumlah casual / jumlah cnt)
+    cube = ds.filtered_cube(spec)
+    stats = merge_moments(cube, by, columns=['casual_ratio'])
+    sums = cube.groupby(by, sort=True)[['casual_sum', 'cnt_sum']].sum()
+    result = pd.DataFrame({
+        'days': stats['n'],
+        'mean': stats['casual_ratio_mean'],
+        'std': stddev(stats, 'casual_ratio'),
+    })
+    result['cv'] = result['std'] / result['mean'] * 100
+    result['pooled_share'] = sums['casual_sum'] / sums['cnt_sum']
+    return result.reset_index()
+
+
+# Daftar analisis yang tersedia untuk akses headless (misalnya lewat api.py)
+METRICS = {
+    'daily_totals': daily_totals,
+    'daily_anomalies': daily_anomalies,
+    'seasonal_means': seasonal_means,
+    'weather_means': weather_means,
+    'workingday_means': workingday_means,
+    'hourly_means': hourly_means,
+    'hourly_user_type_means': hourly_user_type_means,
+    'user_segments': user_segments,
+    'user_type_means': user_type_means,
+    'user_type_comparison': user_type_comparison,
+    'weekday_user_type_means': weekday_user_type_means,
+    'correlation_matrix': correlation_matrix,
+    'monthly_means': monthly_means,
+    'quarterly_means': quarterly_means,
+    'weekday_year_means': weekday_year_means,
+    'casual_ratio_series': casual_ratio_series,
+    'seasonal_segment': seasonal_segment,
+    'weather_elasticity': weather_elasticity,
+    'weather_pct_change': weather_pct_change,
+    'monthly_volatility': monthly_volatility,
+    'casual_ratio_stats': casual_ratio_stats,
+}
+
+HOURLY_METRICS = {'hourly_means', 'hourly_user_type_means'}
@@ -0,0 +1,141 @@
+"""Server HTTP/JSON ringan untuk hasil analisis dashboard tanpa Streamlit.
+
+Menjalankan server:
+    python api.py --port 8502
+
+Contoh permintaan:
+    curl http://localhost:8502/
+    curl "http://localhost:8502/seasonal_means?start_date=2012-01-01&workingday=1"
+    curl "http://localhost:8502/hourly_means?seasons=2,3&hours=7,9"
+    curl "http://localhost:8502/seasonal_segment?user_type=registered"
+"""
+import argparse
+import json
+import os
+import threading
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import analytics
+from cachestore import MemoryStore, filter_key, shared_store
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+# Cache respons: store dari DASHBOARD_CACHE_URL, atau LRU di memori proses
+_responses = shared_store() or MemoryStore()
+
+
+def get_dataset(granularity):
+    # Dataset dimuat sekali per granularitas dan dipakai bersama oleh semua
+    # permintaan; baris yang ditambahkan ke CSV ikut dimuat pada permintaan berikutnya
+    with _datasets_lock:
+        if granularity not in _datasets:
+            _datasets[granularity] = analytics.LiveDataset(granularity)
+        live = _datasets[granularity]
+    return live.refresh()
+
+
+def metric_response(name, granularity, spec, **kwargs):
+    # Body JSON untuk satu analisis. Hasilnya dibagi lewat cache bersama, dengan
+    # versi data sebagai bagian key; dipakai juga oleh prewarm.py
+    dataset = get_dataset(granularity)
+    key = "api:" + filter_key(dict(
+        metric=name,
+        granularity=granularity,
+        version=dataset.version,
+        spec=asdict(spec),
+        **kwargs
+    ))
+    body = _responses.get(key)
+    if body is None:
+        body = to_json(analytics.METRICS[name](dataset, spec, **kwargs)).encode()
+        _responses.set(key, body)
+    return body
+
+
+def to_json(result):
+    # DataFrame hasil analisis -> daftar record JSON; index bernama ikut disertakan
+    if any(result.index.names) or not isinstance(result.index, pd.RangeIndex):
+        result = result.reset_index()
+    result = result.rename(columns=str)
+    for col in result.columns:
+        if isinstance(result[col].dtype, pd.PeriodDtype):
+            result[col] = result[col].astype(str)
+    return result.to_json(orient='records', date_format='iso')
+
+
+class AnalyticsHandler(BaseHTTPRequestHandler):
+
+    def _send(self, status, body):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = url.path.strip('/')
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if not name:
+            self._send(200, json.dumps({'metrics': sorted(analytics.METRICS)}))
+            return
+        if name not in analytics.METRICS:
+            self._send_error(404, f"Analisis '{name}' tidak dikenal")
+            return
+
+        granularity = params.pop('granularity', 'daily')
+        if name in analytics.HOURLY_METRICS:
+            granularity = 'hourly'
+        if granularity not in ('daily', 'hourly'):
+            self._send_error(400, "granularity harus 'daily' atau 'hourly'")
+            return
+
+        kwargs = {}
+        if name == 'seasonal_segment':
+            kwargs['user_type'] = params.pop('user_type', 'casual')
+            if kwargs['user_type'] not in ('casual', 'registered'):
+                self._send_error(400, "user_type harus 'casual' atau 'registered'")
+                return
+
+        try:
+            spec = analytics.FilterSpec.from_params(params)
+            body = metric_response(name, granularity, spec, **kwargs)
+        except ValueError as error:
+            self._send_error(400, str(error))
+            return
+        self._send(200, body.decode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server JSON untuk analisis peminjaman sepeda")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--data-dir', help="direktori berisi banyak file partisi day*.csv/hour*.csv")
+    parser.add_argument('--engine', choices=['pandas', 'duckdb'], help="engine query (default: pandas)")
+    args = parser.parse_args()
+    if args.data_dir:
+        os.environ[analytics.DATA_DIR_ENV] = args.data_dir
+    if args.engine:
+        os.environ[analytics.ENGINE_ENV] = args.engine
+
+    server = ThreadingHTTPServer((args.host, args.port), AnalyticsHandler)
+    print(f"Server analisis berjalan di http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
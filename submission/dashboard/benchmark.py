@@ -0,0 +1,202 @@
+"""Benchmark tahap-tahap dashboard pada data sintetis berukuran besar.
+
+Dataset day.csv/hour.csv diperbesar 10x-10.000x dengan skema yang sama
+(lebih banyak tahun dan stasiun), lalu setiap tahap diukur terpisah: baca CSV,
+kolom turunan, kubus agregat, indeks filter, filter, setiap agregasi analisis,
+dan render gambar. Hasil ditulis sebagai JSON.
+
+Contoh:
+    python benchmark.py --dataset day --scales 10 100 1000 --output bench.json
+    python benchmark.py --dataset hour --scales 10 --repeat 3
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import analytics
+from cube import build_cube
+from features import derive_features
+from figcache import figure_to_png
+from ingest import read_daily, read_hourly
+
+# Batas jumlah periode waktu (salinan dua tahun) agar tanggal dan kolom yr (int8) tetap valid;
+# skala di atas batas ini ditambahkan sebagai stasiun lain pada tanggal yang sama
+MAX_PERIODS = 50
+
+# Filter yang mewakili pemakaian umum dashboard
+BENCH_SPEC = analytics.FilterSpec(
+    start_date='2011-03-01',
+    end_date='2012-10-31',
+    seasons=(2, 3),
+    weathers=(1, 2),
+    workingday=1,
+    hours=(7, 19),
+)
+
+
+def synthesize(base, scale, seed=0):
+    # Membuat salinan base sebanyak scale kali: salinan ke-k digeser
+    # (k // stations) periode ke depan, dan jumlah peminjaman diberi noise
+    rng = np.random.default_rng(seed)
+    periods = min(scale, MAX_PERIODS)
+    stations = -(-scale // periods)
+    copies = periods * stations
+    n = len(base)
+
+    dates = pd.to_datetime(base['dteday']).to_numpy()
+    span = (dates.max() - dates.min()) + np.timedelta64(1, 'D')
+    row = np.tile(np.arange(n), copies)
+    period = np.repeat(np.arange(copies) // stations, n)
+
+    synthetic = base.iloc[row].reset_index(drop=True)
+    synthetic['dteday'] = dates[row] + period * span
+    synthetic['yr'] = (pd.DatetimeIndex(synthetic['dteday']).year - 2011).astype('int16')
+    synthetic['instant'] = np.arange(1, len(synthetic) + 1)
+    noise = rng.lognormal(0.0, 0.1, size=(len(synthetic), 2))
+    synthetic['casual'] = np.rint(synthetic['casual'].to_numpy() * noise[:, 0]).astype('int64')
+    synthetic['registered'] = np.rint(synthetic['registered'].to_numpy() * noise[:, 1]).astype('int64')
+    synthetic['cnt'] = synthetic['casual'] + synthetic['registered']
+    return synthetic
+
+
+def timed(fn, repeat):
+    # Waktu terbaik dari beberapa kali percobaan, beserta hasil percobaan terakhir
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _render_line(data):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(data['date'], data['cnt'], linewidth=1)
+    return figure_to_png(fig)
+
+
+def _render_bar(data):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.bar(data['season'].astype(str), data['cnt'])
+    return figure_to_png(fig)
+
+
+def _render_heatmap(data):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(data, annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
+    return figure_to_png(fig)
+
+
+def _render_scatter(data):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(6, 5))
+    ax.scatter(data['temp'], data['cnt'], s=4)
+    return figure_to_png(fig)
+
+
+RENDERERS = {
+    'daily_totals': _render_line,
+    'seasonal_means': _render_bar,
+    'correlation_matrix': _render_heatmap,
+}
+
+
+def run_case(dataset, scale, repeat, workdir):
+    base = pd.read_csv(analytics.find_csv(f"{dataset}.csv"))
+    synthetic = synthesize(base, scale)
+    csv_path = os.path.join(workdir, f"{dataset}_x{scale}.csv")
+    synthetic.to_csv(csv_path, index=False, date_format='%Y-%m-%d')
+    rows = len(synthetic)
+    del synthetic
+
+    stages = {}
+    if dataset == 'hour':
+        stages['load_csv'], (hour_df, daily_df) = timed(lambda: read_hourly(csv_path), repeat)
+    else:
+        hour_df = None
+        stages['load_csv'], daily_df = timed(lambda: read_daily(csv_path), repeat)
+    os.remove(csv_path)
+
+    stages['derive_features'], features = timed(lambda: derive_features(daily_df), repeat)
+    stages['build_cube'], cube = timed(lambda: build_cube(daily_df, moments=True), repeat)
+    hour_cube = None
+    if hour_df is not None:
+        stages['build_hour_cube'], hour_cube = timed(lambda: build_cube(hour_df, extra_keys=['hr']), repeat)
+    stages['build_filter_index'], ds = timed(lambda: analytics.Dataset(features, cube, hour_cube), repeat)
+
+    stages['filter_mask'], mask = timed(lambda: ds.row_mask(BENCH_SPEC), repeat)
+    stages['filter_rows'], _ = timed(lambda: ds.rows[mask], repeat)
+
+    results = {}
+    for name, metric in analytics.METRICS.items():
+        if name in analytics.HOURLY_METRICS and not ds.hourly:
+            continue
+        # Cache hasil filter dikosongkan agar setiap agregasi diukur dari awal
+        def run_metric(metric=metric):
+            ds.filtered_rows.cache_clear()
+            ds.filtered_cube.cache_clear()
+            ds.filtered_hour_cube.cache_clear()
+            return metric(ds, BENCH_SPEC)
+        stages[f'aggregate:{name}'], results[name] = timed(run_metric, repeat)
+
+    for name, render in RENDERERS.items():
+        stages[f'render:{name}'], _ = timed(lambda: render(results[name]), repeat)
+    filtered = ds.filtered_rows(BENCH_SPEC)
+    stages['render:weather_scatter'], _ = timed(lambda: _render_scatter(filtered), repeat)
+
+    return {
+        'dataset': dataset,
+        'scale': scale,
+        'source_rows': rows,
+        'daily_rows': len(daily_df),
+        'cube_cells': len(cube),
+        'filtered_rows': int(mask.sum()),
+        'seconds': stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tahap-tahap dashboard pada data sintetis")
+    parser.add_argument('--dataset', choices=['day', 'hour'], default='day')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help="file JSON hasil benchmark (default: stdout)")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    report = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            report['results'].append(run_case(args.dataset, scale, args.repeat, workdir))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""Backend cache bersama untuk dashboard dan server analisis.
+
+Semua backend menyimpan pasangan key (string) -> value (bytes) dengan antarmuka
+get(key) / set(key, data):
+
+    memory://                      LRU di memori proses (default)
+    file:///var/cache/dashboard    direktori di disk, aman dipakai bersama oleh
+                                   beberapa proses/replika pada satu host
+    redis://localhost:6379/0       Redis (atau server lain yang kompatibel)
+
+Parameter opsional ditulis sebagai query string, misalnya
+file:///tmp/cache?max_bytes=268435456&ttl=86400 (ttl dalam detik).
+Backend dipilih lewat variabel lingkungan DASHBOARD_CACHE_URL.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+CACHE_URL_ENV = 'DASHBOARD_CACHE_URL'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_MAX_BYTES = 512 * 1024 * 1024
+# Skrip CLI di direktori dashboard yang tidak dijalankan oleh dashboard itu
+# sendiri; bersama file test, tidak ikut dalam code_version
+CLI_SCRIPTS = {'api.py', 'benchmark.py', 'latency.py', 'prewarm.py'}
+
+
+def filter_key(state):
+    # Hash ter-normalisasi dari state filter: urutan key tidak berpengaruh dan
+    # nilai seperti tanggal diubah menjadi string
+    payload = json.dumps(state, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class MemoryStore:
+    # LRU di memori dengan batas total ukuran byte; hanya untuk satu proses
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, data = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                self.total_bytes -= len(self._entries.pop(key)[1])
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= len(self._entries.pop(key)[1])
+            self._entries[key] = (time.time(), data)
+            self.total_bytes += len(data)
+            # Buang entri yang paling lama tidak dipakai sampai kembali di bawah anggaran
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+
+class DiskStore:
+    # Satu file per entri; nama file adalah hash SHA-256 dari key. File ditulis
+    # ke file sementara lalu diganti secara atomik, sehingga proses lain tidak
+    # pernah membaca entri setengah jadi. Umur entri (TTL) dihitung dari waktu
+    # tulis (mtime), sedangkan urutan LRU memakai waktu akses terakhir (atime).
+
+    def __init__(self, directory, max_bytes=DEFAULT_DISK_MAX_BYTES, ttl=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest[2:])
+
+    def _expired(self, stat, now):
+        return self.ttl is not None and now - stat.st_mtime > self.ttl
+
+    def get(self, key):
+        path = self._path(key)
+        now = time.time()
+        try:
+            stat = os.stat(path)
+            if self._expired(stat, now):
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Waktu akses dicatat manual karena banyak filesystem di-mount dengan noatime
+            os.utime(path, (now, stat.st_mtime))
+        except OSError:
+            # Tidak ada, atau baru saja dihapus oleh proses lain
+            return None
+        return data
+
+    def set(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        # Pembersihan dijalankan setelah sekitar 10% anggaran ditulis oleh proses ini
+        self._written += len(data)
+        if self._written > self.max_bytes // 10:
+            self._written = 0
+            self.evict()
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                # File sementara sisa proses yang berhenti di tengah penulisan
+                if shard.name.endswith('.tmp') and time.time() - shard.stat().st_mtime > 3600:
+                    _remove(shard.path)
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+    def evict(self):
+        # Menghapus entri kedaluwarsa, lalu entri yang paling lama tidak dipakai
+        # sampai total ukuran turun ke 90% anggaran. Aman dijalankan bersamaan
+        # oleh beberapa proses: file yang sudah dihapus proses lain dilewati.
+        now = time.time()
+        live = []
+        for path, stat in self._entries():
+            if self._expired(stat, now):
+                _remove(path)
+            else:
+                live.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _, size, _ in live)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(live):
+            _remove(path)
+            total -= size
+            if total <= self.max_bytes * 0.9:
+                break
+
+
+class RedisStore:
+    # Redis atau server kompatibel; client cukup memiliki get() dan
+    # set(name, value, px=...). Batas ukuran diatur di sisi server
+    # (maxmemory dengan kebijakan allkeys-lru). TTL dalam detik dan dikirim
+    # dalam milidetik (px), sehingga TTL di bawah 1 detik tetap berlaku.
+
+    def __init__(self, client, prefix='dashboard:', ttl=None):
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"TTL harus lebih dari 0 detik: {ttl}")
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, data):
+        px = None if self.ttl is None else max(round(self.ttl * 1000), 1)
+        self.client.set(self.prefix + key, data, px=px)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def open_store(url=None):
+    # Membuat backend dari URL (lihat docstring modul); tanpa URL dipakai
+    # DASHBOARD_CACHE_URL, atau memori proses jika variabel tersebut kosong
+    url = url or os.environ.get(CACHE_URL_ENV) or 'memory://'
+    parsed = urlparse(url)
+    options = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+    ttl = float(options['ttl']) if 'ttl' in options else None
+    if ttl is not None and ttl <= 0:
+        raise ValueError(f"TTL harus lebih dari 0 detik: {url}")
+
+    if parsed.scheme == 'memory':
+        return MemoryStore(int(options.get('max_bytes', DEFAULT_MAX_BYTES)), ttl=ttl)
+    if parsed.scheme in ('file', '') or len(parsed.scheme) == 1:
+        # Path biasa juga diterima, termasuk path Windows seperti C:\cache
+        directory = parsed.path if parsed.scheme == 'file' else url.split('?')[0]
+        return DiskStore(directory, int(options.get('max_bytes', DEFAULT_DISK_MAX_BYTES)), ttl=ttl)
+    if parsed.scheme in ('redis', 'rediss'):
+        # Library redis bersifat opsional dan hanya dibutuhkan untuk backend ini
+        import redis
+        client = redis.Redis.from_url(url.split('?')[0])
+        return RedisStore(client, prefix=options.get('prefix', 'dashboard:'), ttl=ttl)
+    raise ValueError(f"Backend cache tidak dikenal: {url}")
+
+
+def shared_store():
+    # Store dari DASHBOARD_CACHE_URL, atau None jika tidak dikonfigurasi
+    url = os.environ.get(CACHE_URL_ENV)
+    return open_store(url) if url else None
+
+
+def code_version(directory=None):
+    # Hash dari modul runtime dashboard; menjadi bagian key cache bersama agar
+    # gambar dari versi kode lama tidak dipakai lagi setelah deploy baru. File
+    # test dan skrip CLI dilewati, sehingga mengubahnya tidak mengosongkan cache.
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py') and not name.startswith('test_') and name not in CLI_SCRIPTS:
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
@@ -0,0 +1,152 @@
+import os
+import tempfile
+from dataclasses import dataclass
+
+# pyarrow bersifat opsional: tanpa pyarrow, data tetap dibaca langsung dari CSV
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+from ingest import complete_size, prefix_digest
+
+SIGNATURE_KEY = b'source_signature'
+# Offset byte CSV yang sudah tercakup cache, dan hash byte sebelum offset tersebut.
+# Jika CSV hanya ditambah baris di akhir, cukup bagian setelah offset yang dibaca.
+OFFSET_KEY = b'source_offset'
+FINGERPRINT_KEY = b'source_fingerprint'
+
+
+@dataclass(frozen=True)
+class Source:
+    # Posisi baca pada CSV sumber: offset byte yang sudah dimuat, hash seluruh
+    # byte sebelum offset tersebut (untuk memastikan file hanya bertambah di
+    # akhir), dan signature file (ukuran dan waktu modifikasi) saat itu
+    csv_path: str
+    offset: int
+    fingerprint: str
+    signature: bytes
+
+    @property
+    def version(self):
+        return f"{self.offset}:{self.fingerprint[:16]}"
+
+
+def source_signature(csv_path):
+    # Cache dianggap valid selama ukuran dan waktu modifikasi file sumber tidak berubah
+    stat = os.stat(csv_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+
+def cache_path(csv_path, name):
+    # File cache disimpan di samping CSV, misalnya day.csv -> day.feather
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), f"{name}.feather")
+
+
+def _read_feather(path):
+    # Mengembalikan (DataFrame, metadata sumber), atau None jika belum ada/rusak
+    if not os.path.exists(path):
+        return None
+    try:
+        # memory_map=True: file dipetakan ke memori, bukan disalin saat dibaca
+        table = feather.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    source = {key: metadata.get(key) for key in (SIGNATURE_KEY, OFFSET_KEY, FINGERPRINT_KEY)}
+    return table.to_pandas(split_blocks=True), source
+
+
+def _write_feather(df, path, source):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update(source)
+    table = table.replace_schema_metadata(metadata)
+
+    # Ditulis ke file sementara lalu diganti secara atomik, sehingga beberapa
+    # proses/replika yang berbagi file cache tidak pernah membaca file setengah jadi
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        # Tanpa kompresi agar file bisa dibaca lewat memory map
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _source_metadata(source):
+    return {
+        SIGNATURE_KEY: source.signature,
+        OFFSET_KEY: str(source.offset).encode(),
+        FINGERPRINT_KEY: source.fingerprint.encode(),
+    }
+
+
+def _verified_prefix(csv_path, metadata, end):
+    # (offset, state hash byte sebelum offset) jika CSV hanya bertambah di akhir
+    # sejak cache ditulis, selain itu None. Verifikasi ini membaca seluruh byte
+    # sebelum offset, O(ukuran file); state hash-nya dipakai lagi untuk
+    # fingerprint baru sehingga prefix tidak di-hash dua kali.
+    if metadata[OFFSET_KEY] is None or metadata[FINGERPRINT_KEY] is None:
+        return None
+    offset = int(metadata[OFFSET_KEY])
+    # Signature berubah tanpa byte baru berarti isi lama file diubah di tempat
+    # (atau hanya disentuh): muat ulang penuh
+    if not 0 < offset < end:
+        return None
+    digest = prefix_digest(csv_path, offset)
+    if digest.hexdigest().encode() != metadata[FINGERPRINT_KEY]:
+        return None
+    return offset, digest
+
+
+def load_with_cache(csv_path, loader, names, append=None):
+    # loader(csv_path, end) mengembalikan tuple DataFrame sesuai urutan names dari
+    # awal file sampai offset end; setiap DataFrame disimpan sebagai file Feather
+    # tersendiri di samping CSV. append(frames, csv_path, start, end) bersifat
+    # opsional: jika CSV hanya bertambah baris, cache lama ditambah dengan baris
+    # pada rentang [start, end) tanpa mem-parse ulang seluruh file.
+    # Mengembalikan (frames, Source), dengan Source.offset = offset byte yang
+    # sudah dibaca.
+
+    # Signature diambil sebelum offset: jika file bertambah di antaranya,
+    # pemuatan berikutnya akan membaca sisa barisnya
+    signature = source_signature(csv_path)
+    end = complete_size(csv_path)
+    if feather is None:
+        return loader(csv_path, end), Source(csv_path, end, prefix_digest(csv_path, end).hexdigest(), signature)
+
+    paths = [cache_path(csv_path, name) for name in names]
+    cached = [_read_feather(path) for path in paths]
+    frames = None
+    if all(entry is not None for entry in cached) and all(metadata == cached[0][1] for _, metadata in cached):
+        metadata = cached[0][1]
+        frames = tuple(frame for frame, _ in cached)
+        if metadata[SIGNATURE_KEY] == signature and metadata[OFFSET_KEY] and metadata[FINGERPRINT_KEY]:
+            return frames, Source(csv_path, int(metadata[OFFSET_KEY]), metadata[FINGERPRINT_KEY].decode(), signature)
+        verified = _verified_prefix(csv_path, metadata, end) if append is not None else None
+        try:
+            frames = None if verified is None else append(frames, csv_path, verified[0], end)
+        except ValueError:
+            # Baris baru tidak berurutan waktu: muat ulang penuh
+            frames = None
+
+    if frames is None:
+        frames = loader(csv_path, end)
+        verified = None
+    # Fingerprint baru: state hash prefix yang sudah diverifikasi diperbarui
+    # dengan byte baru saja; setelah muat ulang penuh, seluruh file di-hash
+    start, digest = verified or (0, None)
+    source = Source(csv_path, end, prefix_digest(csv_path, end, start, digest).hexdigest(), signature)
+    try:
+        metadata = _source_metadata(source)
+        for frame, path in zip(frames, paths):
+            _write_feather(frame, path, metadata)
+    except OSError:
+        # Direktori read-only: lanjutkan tanpa cache persisten
+        pass
+    return frames, source
@@ -0,0 +1,73 @@
+import pandas as pd
+
+from moments import MOMENT_COLS, bucket_moments, mean_col, merge_moments, moment_values
+
+# Kunci dan ukuran pada kubus agregat. Setiap sel kubus menyimpan jumlah (sum)
+# dan banyaknya baris (n) untuk satu kombinasi kunci, sehingga rata-rata untuk
+# kombinasi filter apa pun bisa dihitung dengan menjumlahkan sel-sel kubus.
+CUBE_KEYS = ['date', 'season', 'weathersit', 'workingday', 'weekday']
+CUBE_MEASURES = ['casual', 'registered', 'cnt']
+
+
+def build_cube(df, freq='D', extra_keys=(), moments=False):
+    # Mengelompokkan baris mentah ke dalam sel (bucket tanggal, musim, cuaca, hari kerja, hari)
+    # extra_keys dipakai untuk dimensi tambahan, misalnya 'hr' pada data per jam
+    bucket = df['date'].dt.floor(freq).rename('date')
+    keys = [bucket] + [df[col] for col in CUBE_KEYS[1:] + list(extra_keys)]
+    grouped = df.groupby(keys, sort=True, observed=True)[CUBE_MEASURES]
+    cube = grouped.sum().add_suffix('_sum')
+    cube['n'] = grouped.size()
+    if moments:
+        # Rata-rata dan co-moment per sel untuk korelasi, simpangan baku, dan
+        # statistik rasio pada kombinasi filter apa pun (lihat moments.py)
+        cube = cube.join(bucket_moments(moment_values(df), keys))
+    return with_calendar(cube.reset_index())
+
+
+def with_calendar(cube):
+    # Atribut waktu turunan dari bucket tanggal untuk analisis bulanan/kuartalan
+    cube['year'] = cube['date'].dt.year
+    cube['month'] = cube['date'].dt.month
+    cube['quarter'] = cube['date'].dt.quarter
+    return cube
+
+
+def merge_cubes(cubes, extra_keys=()):
+    # Menggabungkan kubus parsial, misalnya satu kubus per file partisi. Sel
+    # dengan kunci yang sama (tanggal sama dari stasiun berbeda) dijumlahkan,
+    # dan momennya digabung dengan merge_moments.
+    keys = CUBE_KEYS + list(extra_keys)
+    cube = pd.concat(cubes, ignore_index=True)
+    if not cube.duplicated(keys).any():
+        return cube.sort_values(keys, ignore_index=True)
+
+    sum_cols = [f'{m}_sum' for m in CUBE_MEASURES] + ['n']
+    merged = cube.groupby(keys, sort=True)[sum_cols].sum()
+    if mean_col(MOMENT_COLS[0]) in cube.columns:
+        merged = merged.join(merge_moments(cube, keys).drop(columns='n'))
+    return with_calendar(merged.reset_index())
+
+
+def replace_from(cube, start_date, cells):
+    # Kubus terurut menurut tanggal: sel sejak start_date diganti dengan sel baru
+    # dari build_cube, sel sebelumnya dipakai apa adanya. Dipakai saat data baru
+    # ditambahkan, sehingga hanya hari-hari yang tersentuh yang diagregasi ulang.
+    cut = cube['date'].searchsorted(pd.Timestamp(start_date))
+    return pd.concat([cube.iloc[:cut], cells], ignore_index=True)
+
+
+def cube_sum(cube, by, measures=CUBE_MEASURES):
+    # Total per kelompok: menjumlahkan sel-sel kubus
+    sum_cols = [f'{m}_sum' for m in measures]
+    totals = cube.groupby(by, sort=True)[sum_cols].sum()
+    totals.columns = measures
+    return totals.reset_index()
+
+
+def cube_mean(cube, by, measures=CUBE_MEASURES):
+    # Rata-rata per baris asli = total sum / total n dari sel-sel yang dipilih
+    sum_cols = [f'{m}_sum' for m in measures]
+    totals = cube.groupby(by, sort=True)[sum_cols + ['n']].sum()
+    means = totals[sum_cols].div(totals['n'], axis=0)
+    means.columns = measures
+    return means.reset_index()
@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import os
-import matplotlib.pyplot as plt
+import uuid
+import analytics
+import forecast
+from features import SEASON_NAMES, WEATHER_NAMES, WORKING_DAY_NAMES, DAY_NAMES, MONTH_NAMES
+from figcache import FigureCache, figure_key, figure_to_png
+from cachestore import code_version, shared_store
+from instrument import Profiler
+from downsample import SCATTER_MAX_POINTS, binned_means, density_grid, downsample, stratified_sample
+from vega import BACKENDS, anomaly_spec, timeseries_spec
+from rolling import LiveAnomalies, anomaly_events, quantile_col
+from cube import CUBE_MEASURES
 
 # Mengatur judul halaman dan konfigurasi
 st.set_page_config(
@@ -14,150 +22,346 @@ st.set_page_config(
 # Judul dashboard
 st.title("Dashboard Bycycle Sharing Analysis")
 
-# Memuat dataset (sesuaikan path ke lokasi dataset yang telah diproses)
-@st.cache_data
-@st.cache_data
-def load_data():
-    base_dir = os.path.dirname(__file__)  
-    csv_path = os.path.join(base_dir, "day.csv")
-    st.write("Base directory:", base_dir)
-    st.write("CSV path:", csv_path)
-    if not os.path.exists(csv_path):
-        st.error(f"File {csv_path} tidak ditemukan! Pastikan day.csv ada di direktori yang benar.")
-        raise FileNotFoundError(f"File {csv_path} tidak ditemukan!")
-    day_df = pd.read_csv(csv_path)
-    day_df['date'] = pd.to_datetime(day_df['dteday'])
-    return day_df
-
-# Memuat data
-day_df = load_data()
-
-# Memetakan nilai musim dan cuaca ke nama untuk keterbacaan yang lebih baik
-season_names = {1: 'Musim Semi', 2: 'Musim Panas', 3: 'Musim Gugur', 4: 'Musim Dingin'}
-day_df['season_name'] = day_df['season'].map(season_names)
-
-# Memetakan nilai kondisi cuaca ke nama yang lebih deskriptif
-weather_names = {1: 'Cerah', 2: 'Berawan', 3: 'Hujan/Salju Ringan', 4: 'Hujan/Salju Lebat'}
-day_df['weather_name'] = day_df['weathersit'].map(weather_names)
+# Instrumentasi per tahap (waktu, memori, jumlah baris); aktif lewat
+# "Mode debug performa" di sidebar. Setiap sesi diberi id agar tracemalloc
+# (berlaku untuk seluruh proses) tetap aktif selama ada sesi yang sedang debug.
+profiler = Profiler(
+    enabled=st.session_state.get("debug_mode", False),
+    session=st.session_state.setdefault("profiler_session", uuid.uuid4().hex)
+)
+
+# Memuat dataset beserta kolom turunan, kubus agregat, dan indeks filternya.
+# Hasil parsing CSV disimpan sebagai cache Feather di samping CSV; jika CSV
+# hanya bertambah baris, cukup baris baru yang di-parse. Dataset disimpan
+# sebagai resource (tanpa hashing/penyalinan per rerun) dan bersifat
+# read-only: filter dan agregasi selalu membuat objek baru.
+@st.cache_resource
+def load_data(hourly_mode):
+    try:
+        return analytics.LiveDataset("hourly" if hourly_mode else "daily")
+    except FileNotFoundError as error:
+        st.error(f"{error} Pastikan file CSV ada di direktori dashboard atau dataset.")
+        raise
 
 # Membuat bagian filter di sidebar
 st.sidebar.header("Filter Data")
 
-# Filter untuk rentang tanggal
-min_date = day_df['date'].min().date()
-max_date = day_df['date'].max().date()
-start_date, end_date = st.sidebar.date_input(
-    "Rentang Tanggal",
-    [min_date, max_date],
-    min_value=min_date,
-    max_value=max_date
-)
+# Pilihan granularitas data: harian (day.csv) atau per jam (hour.csv)
+granularity = st.sidebar.radio("Granularitas Data", ["Harian", "Per Jam"], horizontal=True)
+hourly_mode = granularity == "Per Jam"
 
-# Filter untuk pemilihan musim
-selected_seasons = st.sidebar.multiselect(
-    "Pilih Musim",
-    options=list(season_names.values()),
-    default=list(season_names.values())
-)
+# Memuat data beserta kolom turunannya; baris yang ditambahkan ke CSV sejak
+# rerun sebelumnya langsung ikut dimuat
+with profiler.span("load_data") as record:
+    dataset = load_data(hourly_mode).refresh()
+    day_df = dataset.rows
+    record["rows"] = len(day_df)
+
+# Nama musim dan kondisi cuaca untuk keterbacaan yang lebih baik
+season_names = SEASON_NAMES
+weather_names = WEATHER_NAMES
+
+# Mode batch: perubahan filter dikumpulkan dalam satu form dan baru diterapkan
+# saat tombol ditekan, sehingga beberapa klik hanya memicu satu rerun. Di luar
+# mode batch, rerun yang sedang berjalan dihentikan begitu ada input baru
+# (runner.fastReruns), sehingga hanya state filter terbaru yang dirender.
+batch_filters = st.sidebar.toggle("Terapkan filter sekaligus", value=True)
+filter_panel = st.sidebar.form("filter_form", border=False) if batch_filters else st.sidebar.container()
+
+with filter_panel:
+    # Filter untuk rentang tanggal
+    min_date = day_df['date'].min().date()
+    max_date = day_df['date'].max().date()
+    date_range = st.date_input(
+        "Rentang Tanggal",
+        [min_date, max_date],
+        min_value=min_date,
+        max_value=max_date
+    )
+    # Saat baru tanggal awal yang dipilih, rentang dianggap sampai tanggal terakhir;
+    # jika input dikosongkan, seluruh rentang data dipakai
+    if len(date_range) == 2:
+        start_date, end_date = date_range
+    elif date_range:
+        start_date, end_date = date_range[0], max_date
+    else:
+        start_date, end_date = min_date, max_date
+
+    # Filter untuk pemilihan musim; pilihan berupa kode, label hanya untuk tampilan
+    selected_seasons = st.multiselect(
+        "Pilih Musim",
+        options=list(season_names),
+        default=list(season_names),
+        format_func=season_names.get
+    )
+
+    # Filter untuk kondisi cuaca
+    selected_weather = st.multiselect(
+        "Pilih Kondisi Cuaca",
+        options=list(weather_names),
+        default=list(weather_names),
+        format_func=weather_names.get
+    )
 
-# Filter untuk kondisi cuaca
-selected_weather = st.sidebar.multiselect(
-    "Pilih Kondisi Cuaca",
-    options=list(weather_names.values()),
-    default=list(weather_names.values())
+    # Filter untuk hari kerja/libur. Opsi radio adalah posisi di WORKING_DAY_NAMES
+    # karena kode "Semua" adalah None, yang bagi st.radio berarti belum dipilih.
+    working_day_codes = list(WORKING_DAY_NAMES)
+    selected_working_day = working_day_codes[st.radio(
+        "Status Hari",
+        range(len(working_day_codes)),
+        format_func=lambda i: WORKING_DAY_NAMES[working_day_codes[i]]
+    )]
+
+    # Filter untuk rentang jam (hanya pada mode per jam)
+    if hourly_mode:
+        selected_hours = st.slider("Rentang Jam", min_value=0, max_value=23, value=(0, 23))
+
+    if batch_filters:
+        st.form_submit_button("Terapkan Filter", type="primary")
+
+# Spesifikasi filter berbasis kode; mask boolean dari indeks filter dataset
+# digabung sekali, dan baris hanya dimaterialisasi saat grafik tingkat baris
+# perlu digambar
+with profiler.span("filter", rows=len(day_df)):
+    spec = analytics.FilterSpec(
+        start_date=start_date,
+        end_date=end_date,
+        seasons=tuple(selected_seasons),
+        weathers=tuple(selected_weather),
+        workingday=selected_working_day,
+        hours=tuple(selected_hours) if hourly_mode else None
+    )
+    filtered_row_count = int(dataset.row_mask(spec).sum())
+has_rows = filtered_row_count > 0
+
+# Pengaturan tampilan
+st.sidebar.header("Pengaturan Tampilan")
+lazy_mode = st.sidebar.checkbox("Render hanya tab yang aktif", value=True)
+st.sidebar.checkbox("Mode debug performa", key="debug_mode")
+
+# Backend untuk grafik deret waktu: PNG dari matplotlib atau spesifikasi
+# Vega-Lite interaktif yang dirender di browser. Pada kedua backend, deret
+# panjang di-downsample ke jumlah titik yang sesuai lebar grafik.
+chart_backend = st.sidebar.selectbox("Backend Grafik Deret Waktu", BACKENDS)
+downsample_methods = {"LTTB": "lttb", "Min/Max per Bin": "minmax"}
+downsample_method = downsample_methods[st.sidebar.selectbox("Metode Downsampling", list(downsample_methods))]
+
+# Statistik bergulir dan deteksi anomali untuk total harian casual, registered,
+# dan cnt. Jendela dihitung dalam hari yang lolos filter.
+st.sidebar.header("Deteksi Anomali")
+anomaly_window = st.sidebar.slider("Jendela Bergulir (hari)", min_value=7, max_value=90, value=28)
+anomaly_methods = {"Z-score": "zscore", "MAD (robust)": "mad"}
+anomaly_method = anomaly_methods[st.sidebar.radio("Metode Anomali", list(anomaly_methods), horizontal=True)]
+anomaly_threshold = st.sidebar.slider("Ambang Skor Anomali", min_value=2.0, max_value=6.0, value=3.0, step=0.5)
+anomaly_quantiles = st.sidebar.slider("Pita Kuantil Bergulir", min_value=0.0, max_value=1.0, value=(0.1, 0.9), step=0.05)
+
+@st.cache_resource
+def get_code_version():
+    return code_version()
+
+# State filter yang menentukan isi setiap grafik; dipakai sebagai key cache gambar.
+# Versi data dan versi kode ikut menjadi key agar cache bersama tidak
+# menampilkan gambar dari data atau kode yang sudah berubah.
+base_state = {"granularity": granularity, "data_version": dataset.version, "code_version": get_code_version()}
+filter_state = dict(
+    base_state,
+    start_date=start_date,
+    end_date=end_date,
+    seasons=sorted(selected_seasons),
+    weather=sorted(selected_weather),
+    working_day=selected_working_day
+)
+hour_state = dict(filter_state, hours=list(selected_hours)) if hourly_mode else filter_state
+series_state = dict(filter_state, downsample=downsample_method)
+anomaly_state = dict(
+    window=anomaly_window,
+    method=anomaly_method,
+    threshold=anomaly_threshold,
+    quantiles=list(anomaly_quantiles)
 )
 
-# Filter untuk hari kerja/libur
-working_day_options = ["Hari Kerja", "Hari Libur", "Semua"]
-selected_working_day = st.sidebar.radio("Status Hari", working_day_options)
+# Cache gambar hasil render, dipakai bersama oleh semua sesi dalam satu proses.
+# Jika DASHBOARD_CACHE_URL diisi (direktori disk atau Redis), gambar juga
+# dibagi antarproses, antarreplika, dan tetap ada setelah restart.
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(store=shared_store())
 
-# Menerapkan filter ke dataframe
-filtered_df = day_df.copy()
+figure_cache = get_figure_cache()
 
-# Menerapkan filter tanggal
-filtered_df = filtered_df[(filtered_df['date'].dt.date >= start_date) & 
-                           (filtered_df['date'].dt.date <= end_date)]
+def load_plotting():
+    # Matplotlib dan seaborn (ratusan milidetik saat pertama diimpor) baru
+    # dimuat ketika ada grafik yang benar-benar harus digambar. Rerun yang semua
+    # gambarnya diambil dari cache tidak pernah mengimpor keduanya. Backend Agg
+    # dipasang sebelum pyplot dimuat, sehingga tidak ada backend GUI yang dicari.
+    global plt, sns
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-# Menerapkan filter musim
-if selected_seasons:
-    filtered_df = filtered_df[filtered_df['season_name'].isin(selected_seasons)]
+def show_figure(chart_id, draw, state):
+    # Grafik hanya digambar ulang (termasuk agregasinya) ketika belum ada di cache
+    rows = len(day_df) if state is base_state else filtered_row_count
+    key = figure_key(chart_id, state)
+    png = figure_cache.get(key)
+    if png is None:
+        with profiler.span("import_plotting"):
+            load_plotting()
+        with profiler.span(f"draw:{chart_id}", rows=rows):
+            fig = draw()
+        with profiler.span(f"encode:{chart_id}"):
+            png = figure_to_png(fig)
+        figure_cache.put(key, png)
+    with profiler.span(f"display:{chart_id}", rows=rows):
+        st.image(png)
 
-# Menerapkan filter cuaca
-if selected_weather:
-    filtered_df = filtered_df[filtered_df['weather_name'].isin(selected_weather)]
+# Detektor anomali per kombinasi filter dan pengaturan. Saat CSV bertambah,
+# hanya hari-hari baru (beserta konteks satu jendela) yang dihitung ulang.
+@st.cache_resource(max_entries=32)
+def get_anomaly_tracker(granularity, spec, window, method, threshold, quantiles):
+    return LiveAnomalies(CUBE_MEASURES, window, method=method, threshold=threshold, quantiles=quantiles)
 
-# Menerapkan filter hari kerja/libur
-if selected_working_day == "Hari Kerja":
-    filtered_df = filtered_df[filtered_df['workingday'] == 1]
-elif selected_working_day == "Hari Libur":
-    filtered_df = filtered_df[filtered_df['workingday'] == 0]
+def daily_anomalies(spec):
+    tracker = get_anomaly_tracker(granularity, spec, anomaly_window, anomaly_method, anomaly_threshold, anomaly_quantiles)
+    with profiler.span("rolling_anomalies"):
+        return tracker.update(analytics.daily_totals(dataset, spec, CUBE_MEASURES))
+
+def render_tabs(labels, renderers, key):
+    # Mode lazy: hanya isi tab yang sedang dipilih yang dihitung dan digambar.
+    # st.tabs selalu menjalankan isi semua tab, sehingga pada mode lazy pilihan
+    # tab ditampilkan sebagai radio horizontal.
+    if lazy_mode:
+        selected = st.radio(
+            "Pilih tampilan",
+            labels,
+            horizontal=True,
+            key=key,
+            label_visibility="collapsed"
+        )
+        renderers[labels.index(selected)]()
+    else:
+        for tab, render in zip(st.tabs(labels), renderers):
+            with tab:
+                render()
 
 # Bagian Pertanyaan Analisis 1: Faktor-faktor yang mempengaruhi jumlah peminjaman sepeda
 st.header("Analisis Tren dan Faktor yang Mempengaruhi Peminjaman Sepeda")
 
-if not filtered_df.empty:
+if has_rows:
+    # Tabel segmen pengguna (workingday x weekday) dihitung sekali per filter dan
+    # menjadi sumber semua grafik hari kerja/libur, pola mingguan, dan proporsi;
+    # grafik hanya menerima tabel agregat, bukan baris mentah
+    user_segments = analytics.user_segments(dataset, spec)
+    user_type_avg = analytics.segment_means(user_segments, 'workingday').set_index('workingday')
+
     st.subheader("Pertanyaan: Bagaimana tren jumlah peminjaman sepeda harian selama dua tahun terakhir, dan faktor apa saja yang memengaruhinya (musim, cuaca, hari kerja/libur)?")
     
-    # Menggunakan tabs untuk visualisasi pertama
-    trend_tabs = st.tabs(["Tren Harian", "Berdasarkan Musim", "Berdasarkan Cuaca", "Hari Kerja vs Libur"])
-    
     # Tab 1: Tren Harian
-    with trend_tabs[0]:
+    def tab_daily_trend():
         st.subheader("Tren Jumlah Peminjaman Sepeda Harian")
-        fig1, ax1 = plt.subplots(figsize=(10, 5))
-        ax1.plot(filtered_df['date'], filtered_df['cnt'], label='Jumlah Peminjam Harian', color='tab:blue', linewidth=1)
-        ax1.set_title('Tren Jumlah Peminjam Sepeda Harian')
-        ax1.set_xlabel('Tanggal')
-        ax1.set_ylabel('Jumlah Peminjam')
-        ax1.grid(alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig1)
+        anomalies = daily_anomalies(spec)
+        def daily_trend_data():
+            shown = downsample(anomalies, 'date', 'cnt', method=downsample_method)
+            # Titik anomali selalu ikut ditampilkan meskipun tidak terpilih oleh downsampling
+            return anomalies.loc[shown.index.union(anomalies.index[anomalies['cnt_anomaly']])]
+
+        if chart_backend == "Vega-Lite":
+            with profiler.span("vega:daily_trend", rows=filtered_row_count):
+                st.vega_lite_chart(daily_trend_data()[['date', 'cnt', 'cnt_anomaly']], anomaly_spec(
+                    'date', 'cnt', 'cnt_anomaly', 'Tren Jumlah Peminjam Sepeda Harian', 'Tanggal', 'Jumlah Peminjam', 'steelblue'
+                ))
+        else:
+            def draw_daily_trend():
+                fig1, ax1 = plt.subplots(figsize=(10, 5))
+                daily_total = daily_trend_data()
+                center = 'cnt_median' if anomaly_method == 'mad' else 'cnt_mean'
+                ax1.plot(daily_total['date'], daily_total['cnt'], label='Jumlah Peminjam Harian', color='tab:blue', linewidth=1)
+                ax1.plot(daily_total['date'], daily_total[center], label=f'{"Median" if anomaly_method == "mad" else "Rata-rata"} {anomaly_window} Hari', color='tab:orange', linewidth=1.5)
+                ax1.fill_between(
+                    daily_total['date'],
+                    daily_total[f'cnt_{quantile_col(anomaly_quantiles[0])}'],
+                    daily_total[f'cnt_{quantile_col(anomaly_quantiles[1])}'],
+                    color='tab:orange',
+                    alpha=0.2,
+                    label=f'Kuantil {anomaly_quantiles[0]:.2f}-{anomaly_quantiles[1]:.2f}'
+                )
+                flagged = daily_total[daily_total['cnt_anomaly']]
+                ax1.scatter(flagged['date'], flagged['cnt'], color='red', zorder=3, label='Anomali')
+                ax1.set_title('Tren Jumlah Peminjam Sepeda Harian')
+                ax1.set_xlabel('Tanggal')
+                ax1.set_ylabel('Jumlah Peminjam')
+                ax1.grid(alpha=0.3)
+                ax1.legend()
+                plt.tight_layout()
+                return fig1
+            show_figure("daily_trend", draw_daily_trend, dict(series_state, **anomaly_state))
+
+        # Daftar hari anomali untuk total, casual, dan registered
+        events = anomaly_events(anomalies, CUBE_MEASURES)
+        if events.empty:
+            st.info("Tidak ada hari anomali dengan pengaturan yang dipilih.")
+        else:
+            st.write(f"Hari anomali (|skor| > {anomaly_threshold}):")
+            st.dataframe(
+                events.assign(date=events['date'].dt.date).round({'baseline': 1, 'score': 2}),
+                hide_index=True
+            )
     
     # Tab 2: Berdasarkan Musim
-    with trend_tabs[1]:
+    def tab_season():
         st.subheader("Rata-rata Jumlah Peminjam per Musim")
-        fig2, ax2 = plt.subplots(figsize=(10, 5))
-        seasonal_avg = filtered_df.groupby('season_name')['cnt'].mean().reset_index()
-        sns.barplot(x='season_name', y='cnt', data=seasonal_avg, palette='Set2', ax=ax2)
-        ax2.set_title('Rata-rata Jumlah Peminjam Sepeda per Musim')
-        ax2.set_xlabel('Musim')
-        ax2.set_ylabel('Rata-rata Jumlah Peminjam')
-        plt.tight_layout()
-        st.pyplot(fig2)
+        def draw_season_avg():
+            fig2, ax2 = plt.subplots(figsize=(10, 5))
+            seasonal_avg = analytics.seasonal_means(dataset, spec)
+            seasonal_avg['season_name'] = seasonal_avg['season'].map(season_names)
+            sns.barplot(x='season_name', y='cnt', data=seasonal_avg, palette='Set2', ax=ax2)
+            ax2.set_title('Rata-rata Jumlah Peminjam Sepeda per Musim')
+            ax2.set_xlabel('Musim')
+            ax2.set_ylabel('Rata-rata Jumlah Peminjam')
+            plt.tight_layout()
+            return fig2
+        show_figure("season_avg", draw_season_avg, filter_state)
     
     # Tab 3: Berdasarkan Kondisi Cuaca
-    with trend_tabs[2]:
+    def tab_weather():
         st.subheader("Rata-rata Jumlah Peminjam per Kondisi Cuaca")
-        fig3, ax3 = plt.subplots(figsize=(10, 5))
-        weather_avg = filtered_df.groupby('weather_name')['cnt'].mean().reset_index()
-        sns.barplot(x='weather_name', y='cnt', data=weather_avg, palette='Set1', ax=ax3)
-        ax3.set_title('Rata-rata Jumlah Peminjam Sepeda per Kondisi Cuaca')
-        ax3.set_xlabel('Kondisi Cuaca')
-        ax3.set_ylabel('Rata-rata Jumlah Peminjam')
-        plt.tight_layout()
-        st.pyplot(fig3)
+        def draw_weather_avg():
+            fig3, ax3 = plt.subplots(figsize=(10, 5))
+            weather_avg = analytics.weather_means(dataset, spec)
+            weather_avg['weather_name'] = weather_avg['weathersit'].map(weather_names)
+            sns.barplot(x='weather_name', y='cnt', data=weather_avg, palette='Set1', ax=ax3)
+            ax3.set_title('Rata-rata Jumlah Peminjam Sepeda per Kondisi Cuaca')
+            ax3.set_xlabel('Kondisi Cuaca')
+            ax3.set_ylabel('Rata-rata Jumlah Peminjam')
+            plt.tight_layout()
+            return fig3
+        show_figure("weather_avg", draw_weather_avg, filter_state)
     
     # Tab 4: Berdasarkan Status Hari
-    with trend_tabs[3]:
+    def tab_workingday():
         st.subheader("Hari Kerja vs Hari Libur")
-        fig4, ax4 = plt.subplots(figsize=(10, 5))
-        sns.barplot(
-            x='workingday', 
-            y='cnt', 
-            hue='workingday',
-            data=filtered_df, 
-            estimator=np.mean, 
-            errorbar=None, 
-            palette='pastel',
-            ax=ax4
-        )
-        ax4.set_xticklabels(['Hari Libur', 'Hari Kerja'])
-        ax4.set_title('Rata-rata Jumlah Peminjam Sepeda\n(Hari Kerja vs Hari Libur)')
-        ax4.set_xlabel('Jenis Hari')
-        ax4.set_ylabel('Rata-rata Jumlah Peminjam')
-        ax4.legend([],[], frameon=False)
-        plt.tight_layout()
-        st.pyplot(fig4)
+        def draw_workingday_avg():
+            fig4, ax4 = plt.subplots(figsize=(10, 5))
+            workingday_avg = analytics.segment_means(user_segments, 'workingday', ['cnt'])
+            ax4.bar(
+                [WORKING_DAY_NAMES[code] for code in workingday_avg['workingday']],
+                workingday_avg['cnt'],
+                color=[sns.color_palette('pastel')[code] for code in workingday_avg['workingday']]
+            )
+            ax4.set_title('Rata-rata Jumlah Peminjam Sepeda\n(Hari Kerja vs Hari Libur)')
+            ax4.set_xlabel('Jenis Hari')
+            ax4.set_ylabel('Rata-rata Jumlah Peminjam')
+            plt.tight_layout()
+            return fig4
+        show_figure("workingday_avg", draw_workingday_avg, filter_state)
+
+    # Menggunakan tabs untuk visualisasi pertama
+    render_tabs(
+        ["Tren Harian", "Berdasarkan Musim", "Berdasarkan Cuaca", "Hari Kerja vs Libur"],
+        [tab_daily_trend, tab_season, tab_weather, tab_workingday],
+        key="trend_tabs"
+    )
 else:
     st.warning("Tidak ada data yang sesuai dengan filter yang dipilih.")
 
@@ -177,107 +381,156 @@ Berdasarkan analisis di atas:
 4. **Faktor Hari Kerja/Libur**: Hari kerja umumnya memiliki jumlah peminjam lebih tinggi dibanding hari libur, menunjukkan bahwa sepeda banyak digunakan untuk aktivitas rutin seperti perjalanan ke tempat kerja.
 """)
 
+# Bagian Analisis Per Jam (hanya pada mode per jam)
+if hourly_mode:
+    st.header("Analisis Pola Peminjaman Per Jam")
+
+    if not dataset.filtered_hour_cube(spec).empty:
+        st.subheader("Pertanyaan: Pada jam berapa saja permintaan sepeda mencapai puncaknya, dan apakah polanya berbeda antara hari kerja dan hari libur?")
+
+        # Tab 1: Rata-rata peminjaman per jam, hari kerja vs hari libur
+        def tab_hourly_pattern():
+            st.subheader("Rata-rata Jumlah Peminjam per Jam")
+            def draw_hourly_workingday():
+                hourly_avg = analytics.hourly_means(dataset, spec)
+                fig_h1, ax_h1 = plt.subplots(figsize=(12, 6))
+                for workingday, label in [(1, 'Hari Kerja'), (0, 'Hari Libur')]:
+                    day_type_data = hourly_avg[hourly_avg['workingday'] == workingday]
+                    if not day_type_data.empty:
+                        ax_h1.plot(day_type_data['hr'], day_type_data['cnt'], marker='o', linewidth=2, label=label)
+                ax_h1.set_title('Rata-rata Jumlah Peminjam Sepeda per Jam')
+                ax_h1.set_xlabel('Jam')
+                ax_h1.set_ylabel('Rata-rata Jumlah Peminjam')
+                ax_h1.set_xticks(range(24))
+                ax_h1.grid(alpha=0.3)
+                ax_h1.legend()
+                plt.tight_layout()
+                return fig_h1
+            show_figure("hourly_workingday", draw_hourly_workingday, hour_state)
+
+        # Tab 2: Casual vs Registered per jam
+        def tab_hourly_user_type():
+            st.subheader("Pola Jam Pengguna Casual vs Registered")
+            def draw_hourly_user_type():
+                hourly_users = analytics.hourly_user_type_means(dataset, spec)
+                fig_h2, ax_h2 = plt.subplots(figsize=(12, 6))
+                ax_h2.plot(hourly_users['hr'], hourly_users['casual'], marker='o', linewidth=2, label='Casual')
+                ax_h2.plot(hourly_users['hr'], hourly_users['registered'], marker='s', linewidth=2, label='Registered')
+                ax_h2.set_title('Rata-rata Peminjaman per Jam - Casual vs Registered')
+                ax_h2.set_xlabel('Jam')
+                ax_h2.set_ylabel('Rata-rata Jumlah Peminjam')
+                ax_h2.set_xticks(range(24))
+                ax_h2.grid(alpha=0.3)
+                ax_h2.legend()
+                plt.tight_layout()
+                return fig_h2
+            show_figure("hourly_user_type", draw_hourly_user_type, hour_state)
+
+        render_tabs(
+            ["Pola Jam Harian", "Casual vs Registered per Jam"],
+            [tab_hourly_pattern, tab_hourly_user_type],
+            key="hour_tabs"
+        )
+    else:
+        st.warning("Tidak ada data yang sesuai dengan filter yang dipilih.")
+
 
 # Bagian Pertanyaan Analisis 2: Perbandingan pola peminjaman antara casual vs registered
 st.header("Analisis Perbandingan Tipe Pengguna")
 
-if not filtered_df.empty:
+if has_rows:
     st.subheader("Pertanyaan: Bagaimana perbandingan pola peminjaman antara pengguna casual dan registered berdasarkan hari kerja dan hari libur?")
     
-    # Menggunakan tabs untuk visualisasi kedua
-    user_tabs = st.tabs(["Perbandingan Pengguna", "Pola Mingguan", "Proporsi Hari Libur", "Proporsi Hari Kerja"])
-    
     # Tab 1: Perbandingan Pengguna
-    with user_tabs[0]:
+    def tab_user_comparison():
         st.subheader("Perbandingan Pengguna Casual vs Registered")
         
-        fig5, ax5 = plt.subplots(figsize=(12, 6))
-        user_comparison = filtered_df.melt(
-            id_vars=['workingday'],
-            value_vars=['casual', 'registered'],
-            var_name='User Type',
-            value_name='Count'
-        )
-        
-        sns.barplot(
-            data=user_comparison,
-            x='workingday',
-            y='Count',
-            hue='User Type',
-            estimator=np.mean,
-            errorbar=None,
-            palette='viridis',
-            ax=ax5
-        )
-        
-        ax5.set_xticklabels(['Hari Libur', 'Hari Kerja'])
-        ax5.set_title('Rata-rata Jumlah Peminjam Casual vs Registered\n(Hari Kerja vs Hari Libur)')
-        ax5.set_xlabel('Jenis Hari')
-        ax5.set_ylabel('Rata-rata Jumlah Peminjam')
-        ax5.legend(title='Tipe Pengguna')
-        plt.tight_layout()
-        st.pyplot(fig5)
+        def draw_user_type_comparison():
+            fig5, ax5 = plt.subplots(figsize=(12, 6))
+            # Batang berkelompok langsung dari tabel rata-rata format lebar
+            user_type_avg.rename(index=WORKING_DAY_NAMES, columns=str.capitalize).plot.bar(
+                color=sns.color_palette('viridis', 2),
+                rot=0,
+                ax=ax5
+            )
+            ax5.set_title('Rata-rata Jumlah Peminjam Casual vs Registered\n(Hari Kerja vs Hari Libur)')
+            ax5.set_xlabel('Jenis Hari')
+            ax5.set_ylabel('Rata-rata Jumlah Peminjam')
+            ax5.legend(title='Tipe Pengguna')
+            plt.tight_layout()
+            return fig5
+        show_figure("user_type_comparison", draw_user_type_comparison, filter_state)
     
     # Tab 2: Pola Mingguan
-    with user_tabs[1]:
+    def tab_weekly_pattern():
         st.subheader("Pola Mingguan Pengguna Casual vs Registered")
         
-        # Visualisasi tren pola mingguan untuk pengguna casual dan registered
-        fig6, ax6 = plt.subplots(figsize=(12, 6))
-        weekday_avg = filtered_df.groupby('weekday')[['casual', 'registered']].mean().reset_index()
-        weekday_avg['day_name'] = weekday_avg['weekday'].apply(lambda x: ['Minggu', 'Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu'][x])
-        
-        ax6.plot(weekday_avg['weekday'], weekday_avg['casual'], marker='o', linewidth=2, label='Casual')
-        ax6.plot(weekday_avg['weekday'], weekday_avg['registered'], marker='s', linewidth=2, label='Registered')
-        ax6.set_xlabel('Hari dalam Seminggu')
-        ax6.set_ylabel('Rata-rata Jumlah Peminjam')
-        ax6.set_title('Pola Mingguan Peminjaman Sepeda - Casual vs Registered')
-        ax6.set_xticks(range(7))
-        ax6.set_xticklabels(['Minggu', 'Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu'])
-        ax6.grid(alpha=0.3)
-        ax6.legend()
-        plt.tight_layout()
-        st.pyplot(fig6)
+        def draw_weekday_user_type():
+            # Visualisasi tren pola mingguan untuk pengguna casual dan registered
+            fig6, ax6 = plt.subplots(figsize=(12, 6))
+            weekday_avg = analytics.segment_means(user_segments, 'weekday')
+
+            ax6.plot(weekday_avg['weekday'], weekday_avg['casual'], marker='o', linewidth=2, label='Casual')
+            ax6.plot(weekday_avg['weekday'], weekday_avg['registered'], marker='s', linewidth=2, label='Registered')
+            ax6.set_xlabel('Hari dalam Seminggu')
+            ax6.set_ylabel('Rata-rata Jumlah Peminjam')
+            ax6.set_title('Pola Mingguan Peminjaman Sepeda - Casual vs Registered')
+            ax6.set_xticks(range(7))
+            ax6.set_xticklabels(DAY_NAMES)
+            ax6.grid(alpha=0.3)
+            ax6.legend()
+            plt.tight_layout()
+            return fig6
+        show_figure("weekday_user_type", draw_weekday_user_type, filter_state)
     
     # Tab 3: Proporsi Tipe Pengguna (Hari Libur)
-    with user_tabs[2]:
+    def tab_holiday_proportion():
         st.subheader("Proporsi Tipe Pengguna (Hari Libur)")
-        holiday_data = filtered_df[filtered_df['workingday'] == 0]
-        if not holiday_data.empty:
-            fig7, ax7 = plt.subplots(figsize=(8, 8))
-            holiday_avg = holiday_data[['casual', 'registered']].mean()
-            ax7.pie(
-                holiday_avg, 
-                labels=['Casual', 'Registered'], 
-                autopct='%1.1f%%',
-                startangle=90,
-                colors=['#ff9999','#66b3ff']
-            )
-            ax7.set_title('Proporsi Pengguna pada Hari Libur')
-            plt.tight_layout()
-            st.pyplot(fig7)
+        if 0 in user_type_avg.index:
+            def draw_holiday_proportion():
+                fig7, ax7 = plt.subplots(figsize=(8, 8))
+                holiday_avg = user_type_avg.loc[0]
+                ax7.pie(
+                    holiday_avg, 
+                    labels=['Casual', 'Registered'], 
+                    autopct='%1.1f%%',
+                    startangle=90,
+                    colors=['#ff9999','#66b3ff']
+                )
+                ax7.set_title('Proporsi Pengguna pada Hari Libur')
+                plt.tight_layout()
+                return fig7
+            show_figure("holiday_proportion", draw_holiday_proportion, filter_state)
         else:
             st.info("Tidak ada data hari libur yang tersedia dengan filter yang dipilih.")
     
     # Tab 4: Proporsi Tipe Pengguna (Hari Kerja)
-    with user_tabs[3]:
+    def tab_workday_proportion():
         st.subheader("Proporsi Tipe Pengguna (Hari Kerja)")
-        workday_data = filtered_df[filtered_df['workingday'] == 1]
-        if not workday_data.empty:
-            fig8, ax8 = plt.subplots(figsize=(8, 8))
-            workday_avg = workday_data[['casual', 'registered']].mean()
-            ax8.pie(
-                workday_avg, 
-                labels=['Casual', 'Registered'], 
-                autopct='%1.1f%%',
-                startangle=90,
-                colors=['#ff9999','#66b3ff']
-            )
-            ax8.set_title('Proporsi Pengguna pada Hari Kerja')
-            plt.tight_layout()
-            st.pyplot(fig8)
+        if 1 in user_type_avg.index:
+            def draw_workday_proportion():
+                fig8, ax8 = plt.subplots(figsize=(8, 8))
+                workday_avg = user_type_avg.loc[1]
+                ax8.pie(
+                    workday_avg, 
+                    labels=['Casual', 'Registered'], 
+                    autopct='%1.1f%%',
+                    startangle=90,
+                    colors=['#ff9999','#66b3ff']
+                )
+                ax8.set_title('Proporsi Pengguna pada Hari Kerja')
+                plt.tight_layout()
+                return fig8
+            show_figure("workday_proportion", draw_workday_proportion, filter_state)
         else:
             st.info("Tidak ada data hari kerja yang tersedia dengan filter yang dipilih.")
+
+    # Menggunakan tabs untuk visualisasi kedua
+    render_tabs(
+        ["Perbandingan Pengguna", "Pola Mingguan", "Proporsi Hari Libur", "Proporsi Hari Kerja"],
+        [tab_user_comparison, tab_weekly_pattern, tab_holiday_proportion, tab_workday_proportion],
+        key="user_tabs"
+    )
     
     # Kesimpulan analisis
     st.subheader("Jawaban dan Kesimpulan")
@@ -304,49 +557,77 @@ else:
 # Bagian Pertanyaan Analisis 3: Korelasi variabel cuaca dengan jumlah peminjaman sepeda
 st.header("Analisis Pengaruh Faktor Cuaca")
 
-if not filtered_df.empty:
+if has_rows:
     st.subheader("Pertanyaan: Bagaimana pengaruh faktor cuaca (suhu, kelembapan, kecepatan angin) terhadap jumlah peminjaman sepeda?")
         
-    # Membuat tabs untuk visualisasi ketiga
-    weather_tabs = st.tabs(["Korelasi", "Hubungan Faktor Cuaca"])
-        
     # Tab 1: Heatmap Korelasi
-    with weather_tabs[0]:
+    def tab_correlation():
         st.subheader("Korelasi Variabel Cuaca dengan Jumlah Peminjaman")
             
         # Menghitung korelasi variabel numerik
-        num_cols = ['temp', 'atemp', 'hum', 'windspeed', 'cnt']
-        corr = filtered_df[num_cols].corr()
-            
-        fig9, ax9 = plt.subplots(figsize=(10, 8))
-        sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f", ax=ax9)
-        ax9.set_title('Heatmap Korelasi Variabel Numerik dengan Jumlah Peminjam Sepeda')
-        plt.tight_layout()
-        st.pyplot(fig9)
+        def draw_weather_correlation():
+            corr = analytics.correlation_matrix(dataset, spec)
+
+            fig9, ax9 = plt.subplots(figsize=(10, 8))
+            sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f", ax=ax9)
+            ax9.set_title('Heatmap Korelasi Variabel Numerik dengan Jumlah Peminjam Sepeda')
+            plt.tight_layout()
+            return fig9
+        show_figure("weather_correlation", draw_weather_correlation, filter_state)
         
     # Tab 2: Scatter plots
-    with weather_tabs[1]:
+    def tab_weather_scatter():
         st.subheader("Hubungan Faktor Cuaca dengan Jumlah Peminjaman")
-            
-        fig10, axs = plt.subplots(1, 3, figsize=(18, 5))
-            
-        sns.scatterplot(data=filtered_df, x='temp', y='cnt', ax=axs[0])
-        axs[0].set_title('Suhu vs Jumlah Peminjam')
-        axs[0].set_xlabel('Suhu (Normalisasi)')
-        axs[0].set_ylabel('Jumlah Peminjam')
-            
-        sns.scatterplot(data=filtered_df, x='hum', y='cnt', ax=axs[1])
-        axs[1].set_title('Kelembapan vs Jumlah Peminjam')
-        axs[1].set_xlabel('Kelembapan (Normalisasi)')
-        axs[1].set_ylabel('Jumlah Peminjam')
-            
-        sns.scatterplot(data=filtered_df, x='windspeed', y='cnt', ax=axs[2])
-        axs[2].set_title('Kecepatan Angin vs Jumlah Peminjam')
-        axs[2].set_xlabel('Kecepatan Angin (Normalisasi)')
-        axs[2].set_ylabel('Jumlah Peminjam')
-            
-        plt.tight_layout()
-        st.pyplot(fig10)
+
+        # Di atas SCATTER_MAX_POINTS baris, mode otomatis menggambar kepadatan 2D
+        # (satu grid per panel) alih-alih satu marker per baris
+        scatter_modes = ["Otomatis", "Semua Titik", "Sampel Terstratifikasi", "Kepadatan 2D"]
+        scatter_mode = st.radio("Mode Scatter", scatter_modes, horizontal=True, key="scatter_mode")
+        if scatter_mode == "Otomatis":
+            scatter_mode = "Semua Titik" if filtered_row_count <= SCATTER_MAX_POINTS else "Kepadatan 2D"
+
+        def draw_weather_scatter():
+            # Hanya kolom yang digambar yang diambil sebagai array
+            rows = dataset.filtered_rows(spec)
+            cnt = rows['cnt'].to_numpy()
+            # Sampel distratifikasi menurut cnt, sehingga hari dengan peminjaman
+            # ekstrem tetap terwakili pada ketiga panel
+            sample = stratified_sample(cnt) if scatter_mode == "Sampel Terstratifikasi" else slice(None)
+
+            fig10, axs = plt.subplots(1, 3, figsize=(18, 5))
+            panels = [
+                ('temp', 'Suhu vs Jumlah Peminjam', 'Suhu (Normalisasi)'),
+                ('hum', 'Kelembapan vs Jumlah Peminjam', 'Kelembapan (Normalisasi)'),
+                ('windspeed', 'Kecepatan Angin vs Jumlah Peminjam', 'Kecepatan Angin (Normalisasi)'),
+            ]
+            for ax, (col, title, xlabel) in zip(axs, panels):
+                x = rows[col].to_numpy()
+                if scatter_mode == "Kepadatan 2D":
+                    counts, x_edges, y_edges = density_grid(x, cnt)
+                    mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts, 0), cmap='Blues')
+                    fig10.colorbar(mesh, ax=ax, label='Jumlah Baris')
+                else:
+                    ax.scatter(x[sample], cnt[sample], s=12, alpha=0.6)
+                # Garis tren dari rata-rata cnt per bin nilai cuaca, dari semua baris
+                centers, means, _ = binned_means(x, cnt)
+                ax.plot(centers, means, color='tab:red', linewidth=2, label='Rata-rata per Bin')
+                ax.set_title(title)
+                ax.set_xlabel(xlabel)
+                ax.set_ylabel('Jumlah Peminjam')
+                ax.legend()
+
+            plt.tight_layout()
+            return fig10
+        show_figure("weather_scatter", draw_weather_scatter, dict(filter_state, scatter_mode=scatter_mode))
+        if scatter_mode == "Sampel Terstratifikasi" and filtered_row_count > SCATTER_MAX_POINTS:
+            st.caption(f"Menampilkan sampel terstratifikasi sekitar {SCATTER_MAX_POINTS:,} dari {filtered_row_count:,} baris; garis tren dihitung dari semua baris.")
+
+    # Membuat tabs untuk visualisasi ketiga
+    render_tabs(
+        ["Korelasi", "Hubungan Faktor Cuaca"],
+        [tab_correlation, tab_weather_scatter],
+        key="weather_tabs"
+    )
         
     # Kesimpulan Analisis
     st.subheader("Jawaban dan Kesimpulan")
@@ -378,88 +659,88 @@ else:
 # Bagian Pertanyaan Analisis 4: Analisis tren musiman dan pertumbuhan tahunan
 st.header("Analisis Tren Musiman dan Pertumbuhan Tahunan")
 
-# Tambahkan kolom untuk keperluan analisis
-day_df['year'] = day_df['date'].dt.year - 2011  # 0 untuk 2011, 1 untuk 2012
-day_df['month'] = day_df['date'].dt.month
-day_df['total_count'] = day_df['cnt']  # Menggunakan total count untuk analisis
-
 st.subheader("Pertanyaan: Bagaimana pola tren musiman dan pertumbuhan tahunan peminjaman sepeda selama periode 2011-2012?")
 
-# Membuat tabs untuk visualisasi keempat
-trend_tabs = st.tabs(["Tren Bulanan", "Perbandingan Kuartal", "Pola Mingguan"])
-
 # Tab 1: Tren Bulanan
-with trend_tabs[0]:
+def tab_monthly_trend():
     st.subheader("Tren Musiman Peminjaman Sepeda per Bulan")
     
-    # Visualisasi tren musiman per bulan
-    fig11, ax11 = plt.subplots(figsize=(12, 6))
-    monthly_data = day_df.groupby(['year', 'month'])['total_count'].mean().reset_index()
-    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-    monthly_data['month_name'] = monthly_data['month'].apply(lambda x: month_names[x-1])
-
-    # Plot untuk setiap tahun
-    for year in [0, 1]:  # Tahun 2011 (0) dan 2012 (1)
-        year_data = monthly_data[monthly_data['year'] == year]
-        ax11.plot(year_data['month'], year_data['total_count'], 
-                marker='o', 
-                linewidth=2, 
-                label=f'Tahun {year+2011}')
-    
-    ax11.set_xlabel('Bulan')
-    ax11.set_ylabel('Rata-rata Jumlah Peminjam')
-    ax11.set_title('Tren Musiman Peminjaman Sepeda per Bulan (2011-2012)')
-    ax11.set_xticks(range(1, 13))
-    ax11.set_xticklabels(month_names)
-    ax11.grid(alpha=0.3)
-    ax11.legend()
-    plt.tight_layout()
-    st.pyplot(fig11)
+    def draw_monthly_trend():
+        # Visualisasi tren musiman per bulan
+        fig11, ax11 = plt.subplots(figsize=(12, 6))
+        monthly_data = analytics.monthly_means(dataset)
+
+        # Plot untuk setiap tahun
+        for year in [0, 1]:  # Tahun 2011 (0) dan 2012 (1)
+            year_data = monthly_data[monthly_data['year'] == year]
+            ax11.plot(year_data['month'], year_data['total_count'], 
+                    marker='o', 
+                    linewidth=2, 
+                    label=f'Tahun {year+2011}')
+
+        ax11.set_xlabel('Bulan')
+        ax11.set_ylabel('Rata-rata Jumlah Peminjam')
+        ax11.set_title('Tren Musiman Peminjaman Sepeda per Bulan (2011-2012)')
+        ax11.set_xticks(range(1, 13))
+        ax11.set_xticklabels(MONTH_NAMES)
+        ax11.grid(alpha=0.3)
+        ax11.legend()
+        plt.tight_layout()
+        return fig11
+    show_figure("monthly_trend", draw_monthly_trend, base_state)
 
 # Tab 2: Perbandingan Kuartal
-with trend_tabs[1]:
+def tab_quarterly():
     st.subheader("Perbandingan Rata-rata Peminjaman per Kuartal")
     
-    # Visualisasi tren jangka panjang: perbandingan kuartal antar tahun
-    fig12, ax12 = plt.subplots(figsize=(10, 6))
-    day_df['quarter'] = ((day_df['month']-1) // 3) + 1
-    quarterly_data = day_df.groupby(['year', 'quarter'])['total_count'].mean().reset_index()
-
-    sns.barplot(x='quarter', y='total_count', hue='year', 
-              palette=['skyblue', 'orange'],
-              data=quarterly_data, ax=ax12)
-    ax12.set_xlabel('Kuartal')
-    ax12.set_ylabel('Rata-rata Jumlah Peminjam')
-    ax12.set_title('Perbandingan Rata-rata Peminjaman Sepeda per Kuartal (2011 vs 2012)')
-    ax12.set_xticks([0, 1, 2, 3])
-    ax12.set_xticklabels(['Q1 (Jan-Mar)', 'Q2 (Apr-Jun)', 'Q3 (Jul-Sep)', 'Q4 (Oct-Dec)'])
-    ax12.legend(title='Tahun', labels=['2011', '2012'])
-    ax12.grid(axis='y', alpha=0.3)
-    plt.tight_layout()
-    st.pyplot(fig12)
+    def draw_quarterly_comparison():
+        # Visualisasi tren jangka panjang: perbandingan kuartal antar tahun
+        fig12, ax12 = plt.subplots(figsize=(10, 6))
+        quarterly_data = analytics.quarterly_means(dataset)
+
+        sns.barplot(x='quarter', y='total_count', hue='year', 
+                  palette=['skyblue', 'orange'],
+                  data=quarterly_data, ax=ax12)
+        ax12.set_xlabel('Kuartal')
+        ax12.set_ylabel('Rata-rata Jumlah Peminjam')
+        ax12.set_title('Perbandingan Rata-rata Peminjaman Sepeda per Kuartal (2011 vs 2012)')
+        ax12.set_xticks([0, 1, 2, 3])
+        ax12.set_xticklabels(['Q1 (Jan-Mar)', 'Q2 (Apr-Jun)', 'Q3 (Jul-Sep)', 'Q4 (Oct-Dec)'])
+        ax12.legend(title='Tahun', labels=['2011', '2012'])
+        ax12.grid(axis='y', alpha=0.3)
+        plt.tight_layout()
+        return fig12
+    show_figure("quarterly_comparison", draw_quarterly_comparison, base_state)
 
 # Tab 3: Pola Mingguan
-with trend_tabs[2]:
+def tab_weekday_by_year():
     st.subheader("Perbandingan Pola Mingguan Antar Tahun")
     
-    # Visualisasi perbandingan hari dalam seminggu antara tahun 2011 dan 2012
-    fig13, ax13 = plt.subplots(figsize=(12, 6))
-    weekday_data = day_df.groupby(['year', 'weekday'])['total_count'].mean().reset_index()
-    day_names = ['Minggu', 'Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu']
-    weekday_data['day_name'] = weekday_data['weekday'].apply(lambda x: day_names[x])
-
-    sns.lineplot(data=weekday_data, x='weekday', y='total_count', hue='year', 
-               marker='o', markersize=10, linewidth=2,
-               palette=['skyblue', 'orange'], ax=ax13)
-    ax13.set_xlabel('Hari dalam Seminggu')
-    ax13.set_ylabel('Rata-rata Jumlah Peminjam')
-    ax13.set_title('Perbandingan Pola Mingguan Peminjaman Sepeda (2011 vs 2012)')
-    ax13.set_xticks(range(7))
-    ax13.set_xticklabels(day_names)
-    ax13.legend(title='Tahun', labels=['2011', '2012'])
-    ax13.grid(alpha=0.3)
-    plt.tight_layout()
-    st.pyplot(fig13)
+    def draw_weekday_by_year():
+        # Visualisasi perbandingan hari dalam seminggu antara tahun 2011 dan 2012
+        fig13, ax13 = plt.subplots(figsize=(12, 6))
+        weekday_data = analytics.weekday_year_means(dataset)
+
+        sns.lineplot(data=weekday_data, x='weekday', y='total_count', hue='year', 
+                   marker='o', markersize=10, linewidth=2,
+                   palette=['skyblue', 'orange'], ax=ax13)
+        ax13.set_xlabel('Hari dalam Seminggu')
+        ax13.set_ylabel('Rata-rata Jumlah Peminjam')
+        ax13.set_title('Perbandingan Pola Mingguan Peminjaman Sepeda (2011 vs 2012)')
+        ax13.set_xticks(range(7))
+        ax13.set_xticklabels(DAY_NAMES)
+        ax13.legend(title='Tahun', labels=['2011', '2012'])
+        ax13.grid(alpha=0.3)
+        plt.tight_layout()
+        return fig13
+    show_figure("weekday_by_year", draw_weekday_by_year, base_state)
+
+# Membuat tabs untuk visualisasi keempat
+render_tabs(
+    ["Tren Bulanan", "Perbandingan Kuartal", "Pola Mingguan"],
+    [tab_monthly_trend, tab_quarterly, tab_weekday_by_year],
+    key="seasonal_trend_tabs"
+)
 
 # Kesimpulan Analisis
 st.subheader("Jawaban dan Kesimpulan")
@@ -485,115 +766,149 @@ st.write("""
 # Bagian Pertanyaan Analisis 5: Analisis Segmentasi dan Perilaku Pengguna
 st.header("Analisis Segmentasi dan Perilaku Pengguna")
 
-if not filtered_df.empty:
+if has_rows:
     st.subheader("Pertanyaan: Bagaimana segmentasi pengguna berdasarkan rasio casual vs registered dan bagaimana perilaku mereka berbeda?")
     
-    # Menambahkan kolom rasio untuk analisis
-    day_df['casual_ratio'] = day_df['casual'] / day_df['cnt']
-    day_df['registered_ratio'] = day_df['registered'] / day_df['cnt']
-    
-    # Membuat tabs untuk visualisasi kelima
-    segment_tabs = st.tabs(["Distribusi Rasio", "Pola Musiman", "Elastisitas Cuaca", "Volatilitas"])
-    
     # Tab 1: Distribusi dan Tren Rasio
-    with segment_tabs[0]:
+    def tab_ratio_distribution():
         st.subheader("Distribusi dan Tren Rasio Pengguna")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            # Visualisasi distribusi rasio pengguna casual
-            fig14, ax14 = plt.subplots(figsize=(6, 4))
-            sns.histplot(day_df['casual_ratio'], kde=True, bins=20, color='skyblue', ax=ax14)
-            ax14.set_title('Distribusi Rasio Pengguna Casual')
-            ax14.set_xlabel('Rasio Pengguna Casual (casual/total)')
-            ax14.set_ylabel('Frekuensi')
-            plt.tight_layout()
-            st.pyplot(fig14)
+            def draw_casual_ratio_hist():
+                # Visualisasi distribusi rasio pengguna casual
+                fig14, ax14 = plt.subplots(figsize=(6, 4))
+                sns.histplot(analytics.casual_ratio_series(dataset)['casual_ratio'], kde=True, bins=20, color='skyblue', ax=ax14)
+                ax14.set_title('Distribusi Rasio Pengguna Casual')
+                ax14.set_xlabel('Rasio Pengguna Casual (casual/total)')
+                ax14.set_ylabel('Frekuensi')
+                plt.tight_layout()
+                return fig14
+            show_figure("casual_ratio_hist", draw_casual_ratio_hist, base_state)
         
         with col2:
-            # Visualisasi perubahan rasio pengguna casual dari waktu ke waktu
-            fig15, ax15 = plt.subplots(figsize=(6, 4))
-            sns.lineplot(data=day_df, x='date', y='casual_ratio', color='coral', ax=ax15)
-            ax15.set_title('Tren Rasio Pengguna Casual Sepanjang Waktu')
-            ax15.set_xlabel('Tanggal')
-            ax15.set_ylabel('Rasio Pengguna Casual')
-            plt.tight_layout()
-            st.pyplot(fig15)
+            def casual_ratio_data():
+                return downsample(analytics.casual_ratio_series(dataset), 'date', 'casual_ratio', method=downsample_method)
+
+            if chart_backend == "Vega-Lite":
+                with profiler.span("vega:casual_ratio_trend", rows=len(day_df)):
+                    st.vega_lite_chart(casual_ratio_data(), timeseries_spec(
+                        'date', 'casual_ratio', 'Tren Rasio Pengguna Casual Sepanjang Waktu', 'Tanggal', 'Rasio Pengguna Casual', 'coral'
+                    ))
+            else:
+                def draw_casual_ratio_trend():
+                    # Visualisasi perubahan rasio pengguna casual dari waktu ke waktu
+                    fig15, ax15 = plt.subplots(figsize=(6, 4))
+                    ratio_data = casual_ratio_data()
+                    ax15.plot(ratio_data['date'], ratio_data['casual_ratio'], color='coral')
+                    ax15.set_title('Tren Rasio Pengguna Casual Sepanjang Waktu')
+                    ax15.set_xlabel('Tanggal')
+                    ax15.set_ylabel('Rasio Pengguna Casual')
+                    plt.tight_layout()
+                    return fig15
+                show_figure("casual_ratio_trend", draw_casual_ratio_trend, dict(base_state, downsample=downsample_method))
     
     # Tab 2: Pola Musiman Segmen Pengguna
-    with segment_tabs[1]:
+    def tab_seasonal_segment():
         st.subheader("Pola Peminjaman Berdasarkan Musim dan Jenis Hari")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            # Pola peminjaman pengguna casual
-            seasonal_casual = day_df.groupby(['season', 'workingday'])['casual'].mean().reset_index()
-            seasonal_casual_pivot = seasonal_casual.pivot(index='season', columns='workingday', values='casual')
-            
-            fig16, ax16 = plt.subplots(figsize=(6, 5))
-            sns.heatmap(seasonal_casual_pivot, annot=True, cmap='YlGnBu', fmt='.1f', ax=ax16)
-            ax16.set_title('Rata-rata Peminjaman Pengguna Casual\nBerdasarkan Musim dan Jenis Hari')
-            ax16.set_xlabel('Jenis Hari (0: Libur, 1: Kerja)')
-            ax16.set_ylabel('Musim (1: Semi, 2: Panas, 3: Gugur, 4: Dingin)')
-            plt.tight_layout()
-            st.pyplot(fig16)
+            def draw_seasonal_casual_heatmap():
+                # Pola peminjaman pengguna casual
+                seasonal_casual_pivot = analytics.seasonal_segment(dataset, user_type='casual')
+
+                fig16, ax16 = plt.subplots(figsize=(6, 5))
+                sns.heatmap(seasonal_casual_pivot, annot=True, cmap='YlGnBu', fmt='.1f', ax=ax16)
+                ax16.set_title('Rata-rata Peminjaman Pengguna Casual\nBerdasarkan Musim dan Jenis Hari')
+                ax16.set_xlabel('Jenis Hari (0: Libur, 1: Kerja)')
+                ax16.set_ylabel('Musim (1: Semi, 2: Panas, 3: Gugur, 4: Dingin)')
+                plt.tight_layout()
+                return fig16
+            show_figure("seasonal_casual_heatmap", draw_seasonal_casual_heatmap, base_state)
         
         with col2:
-            # Pola peminjaman pengguna registered
-            seasonal_registered = day_df.groupby(['season', 'workingday'])['registered'].mean().reset_index()
-            seasonal_registered_pivot = seasonal_registered.pivot(index='season', columns='workingday', values='registered')
-            
-            fig17, ax17 = plt.subplots(figsize=(6, 5))
-            sns.heatmap(seasonal_registered_pivot, annot=True, cmap='YlOrRd', fmt='.1f', ax=ax17)
-            ax17.set_title('Rata-rata Peminjaman Pengguna Registered\nBerdasarkan Musim dan Jenis Hari')
-            ax17.set_xlabel('Jenis Hari (0: Libur, 1: Kerja)')
-            ax17.set_ylabel('Musim (1: Semi, 2: Panas, 3: Gugur, 4: Dingin)')
-            plt.tight_layout()
-            st.pyplot(fig17)
+            def draw_seasonal_registered_heatmap():
+                # Pola peminjaman pengguna registered
+                seasonal_registered_pivot = analytics.seasonal_segment(dataset, user_type='registered')
+
+                fig17, ax17 = plt.subplots(figsize=(6, 5))
+                sns.heatmap(seasonal_registered_pivot, annot=True, cmap='YlOrRd', fmt='.1f', ax=ax17)
+                ax17.set_title('Rata-rata Peminjaman Pengguna Registered\nBerdasarkan Musim dan Jenis Hari')
+                ax17.set_xlabel('Jenis Hari (0: Libur, 1: Kerja)')
+                ax17.set_ylabel('Musim (1: Semi, 2: Panas, 3: Gugur, 4: Dingin)')
+                plt.tight_layout()
+                return fig17
+            show_figure("seasonal_registered_heatmap", draw_seasonal_registered_heatmap, base_state)
     
     # Tab 3: Elastisitas terhadap Cuaca
-    with segment_tabs[2]:
+    def tab_weather_elasticity():
         st.subheader("Elastisitas Permintaan terhadap Kondisi Cuaca")
         
         # Analisis elastisitas permintaan terhadap kondisi cuaca
-        weather_elasticity = day_df.groupby(['weathersit'])[['casual', 'registered', 'cnt']].mean()
+        weather_elasticity = analytics.weather_elasticity(dataset)
         
-        fig18, ax18 = plt.subplots(figsize=(10, 6))
-        weather_elasticity.plot(kind='bar', ax=ax18)
-        ax18.set_title('Pengaruh Kondisi Cuaca terhadap Jumlah Peminjaman')
-        ax18.set_xlabel('Kondisi Cuaca (1: Cerah, 2: Mendung, 3: Hujan)')
-        ax18.set_ylabel('Rata-rata Jumlah Peminjaman')
-        ax18.set_xticklabels(['Cerah', 'Mendung', 'Hujan'], rotation=0)
-        ax18.legend(['Casual', 'Registered', 'Total'])
-        ax18.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig18)
+        def draw_weather_elasticity():
+            fig18, ax18 = plt.subplots(figsize=(10, 6))
+            weather_elasticity.plot(kind='bar', ax=ax18)
+            ax18.set_title('Pengaruh Kondisi Cuaca terhadap Jumlah Peminjaman')
+            ax18.set_xlabel('Kondisi Cuaca (1: Cerah, 2: Mendung, 3: Hujan)')
+            ax18.set_ylabel('Rata-rata Jumlah Peminjaman')
+            ax18.set_xticklabels(['Cerah', 'Mendung', 'Hujan'], rotation=0)
+            ax18.legend(['Casual', 'Registered', 'Total'])
+            ax18.grid(axis='y', alpha=0.3)
+            plt.tight_layout()
+            return fig18
+        show_figure("weather_elasticity", draw_weather_elasticity, base_state)
         
         # Menghitung persentase perubahan
-        weather_pct_change = weather_elasticity.pct_change() * 100
+        weather_pct_change = analytics.weather_pct_change(dataset)
         st.write("Persentase Perubahan Peminjaman saat Perubahan Kondisi Cuaca:")
         st.dataframe(weather_pct_change.round(2))
     
     # Tab 4: Volatilitas Peminjaman
-    with segment_tabs[3]:
+    def tab_volatility():
         st.subheader("Volatilitas Peminjaman Sepeda per Bulan")
         
-        # Identifikasi pola variabilitas harian
-        day_df['month_year'] = day_df['date'].dt.to_period('M')
-        monthly_volatility = day_df.groupby('month_year')['cnt'].agg(['mean', 'std'])
-        monthly_volatility['cv'] = monthly_volatility['std'] / monthly_volatility['mean'] * 100  # Coefficient of variation
-        
-        fig19, ax19 = plt.subplots(figsize=(12, 6))
-        ax19.bar(monthly_volatility.index.astype(str), monthly_volatility['cv'], color='teal')
-        ax19.set_title('Volatilitas Peminjaman Sepeda per Bulan (Coefficient of Variation)')
-        ax19.set_xlabel('Bulan')
-        ax19.set_ylabel('Coefficient of Variation (%)')
-        plt.xticks(rotation=45)
-        ax19.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig19)
+        def draw_monthly_volatility():
+            # Identifikasi pola variabilitas harian
+            monthly_volatility = analytics.monthly_volatility(dataset)
+
+            fig19, ax19 = plt.subplots(figsize=(12, 6))
+            ax19.bar(monthly_volatility.index.astype(str), monthly_volatility['cv'], color='teal')
+            ax19.set_title('Volatilitas Peminjaman Sepeda per Bulan (Coefficient of Variation)')
+            ax19.set_xlabel('Bulan')
+            ax19.set_ylabel('Coefficient of Variation (%)')
+            plt.xticks(rotation=45)
+            ax19.grid(axis='y', alpha=0.3)
+            plt.tight_layout()
+            return fig19
+        show_figure("monthly_volatility", draw_monthly_volatility, base_state)
+
+        def draw_rolling_volatility():
+            # Volatilitas bergulir harian (tidak terikat batas bulan kalender)
+            rolling_stats = daily_anomalies(analytics.ALL)
+            fig22, ax22 = plt.subplots(figsize=(12, 4))
+            for measure, color in [('cnt', 'teal'), ('casual', 'tab:orange'), ('registered', 'tab:green')]:
+                rolling_cv = rolling_stats[f'{measure}_std'] / rolling_stats[f'{measure}_mean'] * 100
+                ax22.plot(rolling_stats['date'], rolling_cv, color=color, label=measure.capitalize())
+            ax22.set_title(f'Coefficient of Variation Bergulir {anomaly_window} Hari')
+            ax22.set_xlabel('Tanggal')
+            ax22.set_ylabel('Coefficient of Variation (%)')
+            ax22.grid(alpha=0.3)
+            ax22.legend()
+            plt.tight_layout()
+            return fig22
+        show_figure("rolling_volatility", draw_rolling_volatility, dict(base_state, **anomaly_state))
+
+    # Membuat tabs untuk visualisasi kelima
+    render_tabs(
+        ["Distribusi Rasio", "Pola Musiman", "Elastisitas Cuaca", "Volatilitas"],
+        [tab_ratio_distribution, tab_seasonal_segment, tab_weather_elasticity, tab_volatility],
+        key="segment_tabs"
+    )
     
     # Kesimpulan dan Rekomendasi
     st.subheader("Insight dan Rekomendasi Strategis")
@@ -628,3 +943,112 @@ if not filtered_df.empty:
     """)
 else:
     st.warning("Tidak ada data yang sesuai dengan filter yang dipilih.")
+
+# Bagian Prakiraan Permintaan: model ridge berbasis cuaca dan kalender (forecast.py)
+st.header("Prakiraan Permintaan Berbasis Cuaca")
+
+st.subheader("Pertanyaan: Berapa perkiraan jumlah peminjaman sepeda pada hari-hari berikutnya, dan seberapa akurat perkiraannya?")
+
+# Koefisien model disimpan di disk di samping CSV dan hanya di-fit ulang saat
+# data berubah; di sini model cukup dimuat sekali per versi data
+@st.cache_resource(max_entries=4)
+def get_demand_model(_dataset, granularity, data_version):
+    return forecast.dataset_model(_dataset)
+
+# Skor backtest hanya dihitung sekali per versi data dan horizon
+@st.cache_resource(max_entries=16)
+def get_backtest_scores(_dataset, granularity, data_version, horizon):
+    return forecast.backtest(_dataset.rows, horizon)
+
+forecast_col1, forecast_col2 = st.columns(2)
+with forecast_col1:
+    forecast_horizon = st.slider("Horizon Prakiraan (hari)", min_value=7, max_value=60, value=forecast.DEFAULT_HORIZON)
+with forecast_col2:
+    # 0 berarti cuaca normal bulanan dari data historis
+    weather_scenario = st.selectbox(
+        "Skenario Cuaca",
+        [0] + list(weather_names),
+        format_func=lambda code: weather_names.get(code, "Normal Musiman")
+    )
+forecast_state = dict(base_state, horizon=forecast_horizon, weather_scenario=weather_scenario)
+
+# Tab 1: Prakiraan ke depan
+def tab_forecast():
+    st.subheader(f"Prakiraan Jumlah Peminjam {forecast_horizon} Hari ke Depan")
+    last_date = day_df['date'].max()
+    weather = None if weather_scenario == 0 else {'weathersit': [weather_scenario] * forecast_horizon}
+    predicted = forecast.forecast(get_demand_model(dataset, granularity, dataset.version), last_date, forecast_horizon, weather=weather)
+
+    def draw_demand_forecast():
+        history = analytics.daily_totals(dataset)
+        history = history[history['date'] > last_date - pd.Timedelta(days=90)]
+        fig20, ax20 = plt.subplots(figsize=(12, 5))
+        ax20.plot(history['date'], history['cnt'], color='tab:blue', linewidth=1, label='Aktual (90 hari terakhir)')
+        ax20.plot(predicted['date'], predicted['cnt'], color='tab:red', marker='o', linewidth=2, label='Prakiraan Total')
+        ax20.plot(predicted['date'], predicted['registered'], color='tab:green', linestyle='--', label='Prakiraan Registered')
+        ax20.plot(predicted['date'], predicted['casual'], color='tab:orange', linestyle='--', label='Prakiraan Casual')
+        ax20.set_title('Prakiraan Jumlah Peminjam Sepeda Harian')
+        ax20.set_xlabel('Tanggal')
+        ax20.set_ylabel('Jumlah Peminjam')
+        ax20.grid(alpha=0.3)
+        ax20.legend()
+        plt.tight_layout()
+        return fig20
+    show_figure("demand_forecast", draw_demand_forecast, forecast_state)
+
+    st.dataframe(
+        predicted.assign(date=predicted['date'].dt.date).round().astype({col: 'int64' for col in forecast.TARGETS}),
+        hide_index=True
+    )
+
+# Tab 2: Akurasi model dari backtest rolling-origin
+def tab_backtest():
+    st.subheader("Akurasi Model (Backtest Rolling-Origin)")
+    scores = get_backtest_scores(dataset, granularity, dataset.version, forecast_horizon)
+    metric_col1, metric_col2 = st.columns(2)
+    metric_col1.metric("Rata-rata Galat Absolut (MAE) Harian", f"{scores['cnt_mae'].mean():,.0f}")
+    metric_col2.metric("Galat Persentase Tertimbang (WAPE)", f"{scores['cnt_wape'].mean():.1f}%")
+
+    def draw_backtest_error():
+        fig21, ax21 = plt.subplots(figsize=(12, 5))
+        ax21.plot(scores['origin'], scores['casual_mae'], marker='o', label='Casual')
+        ax21.plot(scores['origin'], scores['registered_mae'], marker='s', label='Registered')
+        ax21.plot(scores['origin'], scores['cnt_mae'], marker='^', label='Total')
+        ax21.set_title(f'MAE Prakiraan {forecast_horizon} Hari per Titik Origin Backtest')
+        ax21.set_xlabel('Tanggal Origin')
+        ax21.set_ylabel('MAE (Jumlah Peminjam)')
+        ax21.grid(alpha=0.3)
+        ax21.legend()
+        plt.tight_layout()
+        return fig21
+    show_figure("backtest_error", draw_backtest_error, dict(base_state, horizon=forecast_horizon))
+
+render_tabs(
+    ["Prakiraan", "Akurasi Model"],
+    [tab_forecast, tab_backtest],
+    key="forecast_tabs"
+)
+
+st.write("""
+Model memakai tren tahunan, pola musiman tahunan, hari dalam seminggu, hari libur, dan kondisi cuaca. Tanpa prakiraan cuaca, input cuaca diisi dengan rata-rata bulanan historis; skenario cuaca menggantikan kondisi cuaca untuk seluruh horizon. Backtest memakai cuaca aktual, sehingga galatnya adalah galat model di luar galat prakiraan cuaca.
+""")
+
+# Panel debug performa: rincian span rerun ini beserta ekspor OpenMetrics
+if profiler.enabled:
+    st.sidebar.header("Profil Rerun")
+    st.sidebar.write(f"Total waktu span: {profiler.total_seconds() * 1000:.1f} ms")
+    span_table = pd.DataFrame(profiler.spans)
+    span_table["ms"] = span_table["seconds"] * 1000
+    span_table["alloc_peak_kb"] = span_table["alloc_peak_bytes"] / 1024
+    span_table["rss_proses_delta_kb"] = span_table["rss_delta_bytes"] / 1024
+    st.sidebar.dataframe(
+        span_table[["span", "ms", "alloc_peak_kb", "rss_proses_delta_kb", "rows"]].round(2),
+        hide_index=True
+    )
+    st.sidebar.caption("Alokasi dan RSS diukur untuk seluruh proses, termasuk sesi lain yang berjalan bersamaan.")
+    st.sidebar.download_button(
+        "Unduh Metrik (OpenMetrics)",
+        profiler.to_openmetrics(),
+        file_name="dashboard_metrics.txt",
+        mime="text/plain"
+    )
@@ -0,0 +1,131 @@
+import numpy as np
+
+# Jumlah titik maksimum untuk deret waktu; kira-kira setara lebar grafik dalam piksel
+MAX_POINTS = 1000
+# Jumlah titik maksimum untuk scatter; di atas batas ini dipakai kepadatan
+# 2D atau sampel, sehingga jumlah artist matplotlib tetap terbatas
+SCATTER_MAX_POINTS = 5000
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype('datetime64[ns]').astype('int64')
+    return values.astype('float64')
+
+
+def lttb(x, y, n_out=MAX_POINTS):
+    # Largest-Triangle-Three-Buckets: memilih n_out titik yang paling menjaga
+    # bentuk visual deret. Mengembalikan indeks titik terpilih (terurut).
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = _as_float(y)
+
+    # Titik pertama dan terakhir selalu dipakai; sisanya dibagi ke n_out - 2 bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype('int64')
+    selected = np.empty(n_out, dtype='int64')
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Luas segitiga antara titik terpilih sebelumnya, kandidat, dan rata-rata bucket berikutnya
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(y, n_bins=MAX_POINTS // 2):
+    # Binning min/max: setiap bin menyumbang titik minimum dan maksimumnya,
+    # sehingga puncak dan lembah tetap terlihat. Mengembalikan indeks terurut.
+    n = len(y)
+    if 2 * n_bins >= n:
+        return np.arange(n)
+    y = _as_float(y)
+    bins = np.arange(n) * n_bins // n
+    order = np.lexsort((y, bins))
+    starts = np.flatnonzero(np.r_[True, np.diff(bins[order]) != 0])
+    ends = np.r_[starts[1:], n] - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def downsample(df, x, y, method='lttb', n_out=MAX_POINTS):
+    # Memperkecil DataFrame deret waktu ke jumlah titik yang terbatas
+    if len(df) <= n_out:
+        return df
+    if method == 'minmax':
+        index = minmax(df[y].to_numpy(), n_bins=n_out // 2)
+    else:
+        index = lttb(df[x].to_numpy(), df[y].to_numpy(), n_out=n_out)
+    return df.iloc[index]
+
+
+def density_grid(x, y, bins=(60, 40)):
+    # Kepadatan 2D (histogram2d) untuk scatter berukuran besar: hasilnya satu
+    # grid berukuran tetap, berapa pun jumlah titiknya. Mengembalikan
+    # (counts dengan bentuk (bins_y, bins_x), tepi bin x, tepi bin y).
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return counts.T, x_edges, y_edges
+
+
+def stratified_sample(x, n_out=SCATTER_MAX_POINTS, bins=50, seed=0):
+    # Sampel acak terstratifikasi menurut bin nilai x: setiap bin menyumbang
+    # paling banyak n_out / bins titik, sehingga ekor distribusi x tetap
+    # terwakili. Mengembalikan indeks terurut; hasilnya sama untuk data yang sama.
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    x = _as_float(x)
+    edges = np.linspace(x.min(), x.max(), bins + 1)
+    strata = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, bins - 1)
+    keys = np.random.default_rng(seed).random(n)
+    order = np.lexsort((keys, strata))
+    sorted_strata = strata[order]
+    starts = np.searchsorted(sorted_strata, np.arange(bins))
+    rank = np.arange(n) - starts[sorted_strata]
+    # Kuota bin yang datanya sedikit dibagikan ke bin lain
+    sizes = np.bincount(strata, minlength=bins)
+    quota = _fill_quota(sizes, n_out)
+    return np.sort(order[rank < quota[sorted_strata]])
+
+
+def _fill_quota(sizes, n_out):
+    # Kuota per bin: sama rata, dengan sisa kuota dari bin kecil diberikan ke bin
+    # yang lebih besar (water-filling); total paling banyak n_out
+    order = np.sort(sizes)
+    remaining = n_out
+    level = 0
+    for i, size in enumerate(order):
+        share = remaining // (len(order) - i)
+        if size >= share:
+            level = share
+            break
+        remaining -= size
+    else:
+        level = order[-1] if len(order) else 0
+    return np.minimum(sizes, level)
+
+
+def binned_means(x, y, bins=30):
+    # Garis tren: rata-rata y per bin x, dihitung dengan bincount dalam satu
+    # lintasan. Mengembalikan (titik tengah bin, rata-rata, jumlah titik) untuk
+    # bin yang tidak kosong.
+    x = _as_float(x)
+    y = _as_float(y)
+    edges = np.linspace(x.min(), x.max(), bins + 1)
+    index = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    sums = np.bincount(index, weights=y, minlength=bins)
+    filled = counts > 0
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers[filled], sums[filled] / counts[filled], counts[filled]
@@ -0,0 +1,35 @@
+import numpy as np
+
+# Label untuk kode kategori pada dataset; hanya dipakai pada tampilan
+SEASON_NAMES = {1: 'Musim Semi', 2: 'Musim Panas', 3: 'Musim Gugur', 4: 'Musim Dingin'}
+WEATHER_NAMES = {1: 'Cerah', 2: 'Berawan', 3: 'Hujan/Salju Ringan', 4: 'Hujan/Salju Lebat'}
+WORKING_DAY_NAMES = {1: 'Hari Kerja', 0: 'Hari Libur', None: 'Semua'}
+DAY_NAMES = ['Minggu', 'Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu']
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+BASE_YEAR = 2011
+
+
+def derive_features(df):
+    # Seluruh kolom turunan dihitung sekali di sini secara vektor. Hasilnya
+    # adalah DataFrame baru; DataFrame masukan tidak diubah, dan hasil ini juga
+    # diperlakukan sebagai read-only oleh dashboard.
+    date = df['date'].dt
+    cnt = df['cnt'].to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        casual_ratio = df['casual'].to_numpy(dtype='float64') / cnt
+        registered_ratio = df['registered'].to_numpy(dtype='float64') / cnt
+
+    # Kategori (season, weathersit, weekday, workingday) tetap berupa kode
+    # integer kecil untuk filter dan groupby; label dari *_NAMES hanya dipasang
+    # saat ditampilkan.
+    features = {
+        'year': (date.year - BASE_YEAR).astype('int8'),  # 0 untuk 2011, 1 untuk 2012
+        'month': date.month.astype('int8'),
+        'quarter': date.quarter.astype('int8'),
+        'month_year': date.to_period('M'),
+        'total_count': df['cnt'],
+        'casual_ratio': casual_ratio.astype('float32'),
+        'registered_ratio': registered_ratio.astype('float32'),
+    }
+    return df.assign(**features)
@@ -0,0 +1,53 @@
+import io
+
+from cachestore import MemoryStore, filter_key
+
+# Anggaran memori default untuk gambar yang di-cache (dalam byte)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Lebar gambar maksimum (piksel). Streamlit mengecilkan ulang gambar yang lebih
+# lebar dari 1460 px setiap kali ditampilkan, termasuk gambar dari cache.
+MAX_IMAGE_WIDTH = 1400
+
+
+def figure_key(chart_id, state):
+    return f"figure:{chart_id}:{filter_key(state)}"
+
+
+def figure_to_png(fig, dpi=200):
+    # Merender figure ke PNG lalu langsung menutupnya agar objek Figure tidak
+    # menumpuk di proses server yang berjalan lama. pyplot diimpor di sini agar
+    # modul ini (dan gambar dari cache) tidak memuat matplotlib.
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    dpi = min(dpi, MAX_IMAGE_WIDTH / fig.get_figwidth())
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    # Cache dua tingkat untuk gambar hasil render (byte PNG): LRU di memori
+    # proses dengan batas total ukuran byte, ditambah store bersama opsional
+    # (disk atau Redis, lihat cachestore.py) yang dipakai oleh semua proses
+    # dan replika dashboard. Key berupa string dari figure_key().
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, store=None):
+        self._memory = MemoryStore(max_bytes)
+        self.store = store
+
+    def get(self, key):
+        data = self._memory.get(key)
+        if data is None and self.store is not None:
+            data = self.store.get(key)
+            if data is not None:
+                self._memory.set(key, data)
+        return data
+
+    def put(self, key, data):
+        self._memory.set(key, data)
+        if self.store is not None:
+            self.store.set(key, data)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    # Indeks filter untuk satu DataFrame: mask boolean per nilai untuk setiap
+    # kolom kategori, dan tanggal terurut untuk pencarian biner rentang tanggal.
+    # Semua filter digabung dengan satu operasi AND per kolom, lalu baris hanya
+    # dimaterialisasi sekali (atau tidak sama sekali jika cukup agregat).
+
+    def __init__(self, df, columns=('season', 'weathersit', 'workingday'), date_col='date'):
+        self.size = len(df)
+        self._masks = {}
+        for col in columns:
+            values = df[col].to_numpy()
+            self._masks[col] = {value: values == value for value in np.unique(values)}
+
+        dates = df[date_col].to_numpy(dtype='datetime64[ns]')
+        if len(dates) and (dates[1:] >= dates[:-1]).all():
+            self._order = None
+            self._dates = dates
+        else:
+            self._order = np.argsort(dates, kind='stable')
+            self._dates = dates[self._order]
+
+    def _date_mask(self, start_date, end_date):
+        lo = 0
+        hi = self.size
+        if start_date is not None:
+            lo = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start_date), 'ns'), side='left')
+        if end_date is not None:
+            end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+            hi = np.searchsorted(self._dates, np.datetime64(end, 'ns'), side='left')
+        mask = np.zeros(self.size, dtype=bool)
+        if self._order is None:
+            mask[lo:hi] = True
+        else:
+            mask[self._order[lo:hi]] = True
+        return mask
+
+    def mask(self, start_date=None, end_date=None, **selections):
+        # selections: nama kolom -> daftar nilai yang dipilih; daftar kosong atau
+        # None berarti kolom tersebut tidak difilter
+        if start_date is None and end_date is None:
+            mask = np.ones(self.size, dtype=bool)
+        else:
+            mask = self._date_mask(start_date, end_date)
+        empty = np.zeros(self.size, dtype=bool)
+        for col, selected in selections.items():
+            if not selected:
+                continue
+            value_masks = self._masks[col]
+            col_mask = empty.copy()
+            for value in selected:
+                col_mask |= value_masks.get(value, empty)
+            mask &= col_mask
+        return mask
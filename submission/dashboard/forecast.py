@@ -0,0 +1,302 @@
+"""Prakiraan permintaan harian berbasis cuaca dan kalender.
+
+Model linear ridge untuk casual, registered, dan cnt sekaligus. Fiturnya: tren
+tahunan, suku Fourier untuk siklus musiman tahunan, hari dalam seminggu, hari
+libur, kondisi cuaca, dan variabel cuaca (temp, atemp, hum, windspeed). Semua
+perhitungan berupa operasi matriks NumPy:
+
+    fit_ridge   satu solve (X'X + alpha*P) B = X'Y; bisa di-batch untuk banyak
+                stasiun sekaligus
+    forecast    prakiraan seluruh horizon = satu perkalian matriks X @ B
+    backtest    rolling-origin dengan matriks Gram kumulatif, sehingga model
+                untuk semua titik origin di-fit dalam satu batched solve
+
+Koefisien disimpan sebagai file Feather di samping CSV (columnar_cache.py) dan
+hanya di-fit ulang jika CSV berubah. Untuk direktori partisi (misalnya satu
+file per stasiun), model dan backtest per partisi dijalankan di process pool.
+
+Dari command line:
+    python forecast.py --horizon 14
+    python forecast.py --granularity hourly --data-dir /path/ke/data
+"""
+import argparse
+import hashlib
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import load_with_cache
+from features import BASE_YEAR
+from partitions import find_partitions, map_partitions
+from pipeline import load_frames
+
+TARGETS = ['casual', 'registered', 'cnt']
+CALENDAR_FEATURES = [
+    'intercept', 'trend', 'year_sin1', 'year_cos1', 'year_sin2', 'year_cos2',
+    'weekday_1', 'weekday_2', 'weekday_3', 'weekday_4', 'weekday_5', 'weekday_6', 'holiday',
+]
+# Kondisi cuaca 1 (cerah) menjadi kategori dasar
+WEATHER_CODES = [2, 3, 4]
+WEATHER_VARIABLES = ['temp', 'atemp', 'hum', 'windspeed']
+WEATHER_FEATURES = [f'weathersit_{code}' for code in WEATHER_CODES] + WEATHER_VARIABLES
+FEATURE_NAMES = CALENDAR_FEATURES + WEATHER_FEATURES
+
+DEFAULT_ALPHA = 1.0
+DEFAULT_HORIZON = 14
+EPOCH = pd.Timestamp(BASE_YEAR, 1, 1)
+
+
+def calendar_block(dates, holiday=None):
+    # Fitur kalender yang sudah diketahui untuk tanggal mana pun, termasuk
+    # tanggal di masa depan. weekday mengikuti kode dataset (0 = Minggu).
+    dates = pd.DatetimeIndex(dates)
+    n = len(dates)
+    years = (dates - EPOCH).days.to_numpy() / 365.25
+    phase = 2 * np.pi * dates.dayofyear.to_numpy() / 365.25
+    weekday = (dates.dayofweek.to_numpy() + 1) % 7
+    block = np.empty((n, len(CALENDAR_FEATURES)))
+    block[:, 0] = 1.0
+    block[:, 1] = years
+    block[:, 2], block[:, 3] = np.sin(phase), np.cos(phase)
+    block[:, 4], block[:, 5] = np.sin(2 * phase), np.cos(2 * phase)
+    block[:, 6:12] = weekday[:, None] == np.arange(1, 7)
+    block[:, 12] = 0.0 if holiday is None else holiday
+    return block
+
+
+def weather_block(weather):
+    # Fitur cuaca dari kolom weathersit, temp, atemp, hum, dan windspeed
+    codes = weather['weathersit'].to_numpy()
+    return np.column_stack([codes[:, None] == WEATHER_CODES, weather[WEATHER_VARIABLES].to_numpy(dtype='float64')])
+
+
+def training_data(rows):
+    # Tanggal, matriks fitur X, dan target Y dari baris harian terurut. Jika satu
+    # tanggal muncul lebih dari sekali (partisi beberapa stasiun yang digabung),
+    # baris digabung menjadi total jaringan: target dijumlahkan dan fitur
+    # dirata-rata, sehingga dummy cuaca menjadi porsi stasiun per kondisi.
+    X = np.hstack([calendar_block(rows['date'], rows['holiday'].to_numpy()), weather_block(rows)])
+    Y = rows[TARGETS].to_numpy(dtype='float64')
+    dates = pd.DatetimeIndex(rows['date'])
+    if dates.has_duplicates:
+        X = pd.DataFrame(X).groupby(dates, sort=True).mean()
+        Y = pd.DataFrame(Y).groupby(dates, sort=True).sum()
+        dates = X.index
+        X, Y = X.to_numpy(), Y.to_numpy()
+    return dates, X, Y
+
+
+def _penalty(alpha):
+    # Intercept tidak ikut diperkecil
+    penalty = np.eye(len(FEATURE_NAMES)) * alpha
+    penalty[0, 0] = 0.0
+    return penalty
+
+
+def fit_ridge(X, Y, alpha=DEFAULT_ALPHA, weights=None):
+    # Koefisien ridge B dengan bentuk (..., p, k) dari X (..., n, p) dan Y (..., n, k).
+    # Dimensi depan dipakai untuk batch, misalnya ribuan stasiun sekaligus;
+    # weights (..., n) bernilai 0 menandai baris padding pada stasiun yang
+    # datanya lebih pendek.
+    Xw = X if weights is None else X * weights[..., None]
+    gram = Xw.swapaxes(-1, -2) @ X
+    moment = Xw.swapaxes(-1, -2) @ Y
+    return np.linalg.solve(gram + _penalty(alpha), moment)
+
+
+@dataclass(frozen=True)
+class DemandModel:
+    # coef: (fitur x target); normals: rata-rata fitur cuaca per bulan (12 x
+    # fitur cuaca), dipakai sebagai skenario cuaca default untuk prakiraan
+    coef: np.ndarray
+    normals: np.ndarray
+
+    def frames(self):
+        # Bentuk tabel untuk disimpan sebagai file Feather
+        coef = pd.DataFrame(self.coef, columns=TARGETS).assign(feature=FEATURE_NAMES)
+        normals = pd.DataFrame(self.normals, columns=WEATHER_FEATURES).assign(month=range(1, 13))
+        return coef, normals
+
+    @classmethod
+    def from_frames(cls, coef, normals):
+        coef = coef.set_index('feature').loc[FEATURE_NAMES, TARGETS]
+        normals = normals.set_index('month').loc[range(1, 13), WEATHER_FEATURES]
+        return cls(coef.to_numpy(), normals.to_numpy())
+
+
+def weather_normals(dates, X):
+    # Rata-rata fitur cuaca per bulan; bulan tanpa data memakai rata-rata keseluruhan
+    weather = pd.DataFrame(X[:, len(CALENDAR_FEATURES):]).groupby(dates.month).mean()
+    weather = weather.reindex(range(1, 13))
+    return weather.fillna(weather.mean()).to_numpy()
+
+
+def fit_model(rows, alpha=DEFAULT_ALPHA):
+    dates, X, Y = training_data(rows)
+    return DemandModel(fit_ridge(X, Y, alpha), weather_normals(dates, X))
+
+
+def _model_names(csv_path, alpha):
+    # Nama file koefisien memuat alpha dan hash daftar fitur, sehingga file dari
+    # versi fitur lama tidak pernah terbaca
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    features = hashlib.sha1(','.join(FEATURE_NAMES + TARGETS).encode()).hexdigest()[:8]
+    tag = f"{name}_forecast_{alpha:g}_{features}"
+    return [f"{tag}_coef", f"{tag}_normals"]
+
+
+def load_model(csv_path, granularity='daily', alpha=DEFAULT_ALPHA):
+    # Model untuk satu file CSV. Koefisien dibaca dari file Feather di samping
+    # CSV, dan hanya di-fit ulang (dari hasil pipeline) jika CSV berubah.
+    def fit(path, end):
+        return fit_model(load_frames(path, granularity).daily, alpha).frames()
+
+    frames, _ = load_with_cache(csv_path, fit, _model_names(csv_path, alpha))
+    return DemandModel.from_frames(*frames)
+
+
+def dataset_model(ds, alpha=DEFAULT_ALPHA):
+    # Dataset dari satu CSV memakai koefisien tersimpan; dataset dari direktori
+    # partisi atau engine DuckDB di-fit dari total jaringan per tanggal
+    if getattr(ds, 'source', None) is not None:
+        return load_model(ds.source.csv_path, 'hourly' if ds.hourly else 'daily', alpha)
+    return fit_model(ds.rows, alpha)
+
+
+def _future_features(normals, last_date, horizon, weather=None, holiday=None):
+    # Matriks fitur (..., horizon, p) untuk hari-hari setelah last_date. Tanpa
+    # weather, fitur cuaca diambil dari normals bulanan; weather boleh berisi
+    # sebagian kolom (misalnya hanya weathersit dari prakiraan cuaca) yang
+    # menggantikan nilai normal.
+    dates = pd.date_range(pd.Timestamp(last_date) + pd.Timedelta(days=1), periods=horizon, freq='D')
+    calendar = calendar_block(dates, holiday)
+    weather_part = normals[..., dates.month.to_numpy() - 1, :]
+    if weather is not None:
+        weather_part = weather_part.copy()
+        if 'weathersit' in weather:
+            codes = np.asarray(weather['weathersit'])
+            weather_part[..., :len(WEATHER_CODES)] = codes[:, None] == WEATHER_CODES
+        for i, col in enumerate(WEATHER_VARIABLES, start=len(WEATHER_CODES)):
+            if col in weather:
+                weather_part[..., i] = np.asarray(weather[col], dtype='float64')
+    calendar = np.broadcast_to(calendar, weather_part.shape[:-1] + calendar.shape[-1:])
+    return dates, np.concatenate([calendar, weather_part], axis=-1)
+
+
+def predict(X, coef):
+    # Satu perkalian matriks untuk seluruh horizon (dan seluruh batch). Jumlah
+    # peminjam tidak negatif, dan cnt = casual + registered tetap berlaku
+    # setelah pemotongan di nol.
+    predicted = np.clip(X @ coef, 0, None)
+    predicted[..., -1] = predicted[..., 0] + predicted[..., 1]
+    return predicted
+
+
+def forecast(model, last_date, horizon=DEFAULT_HORIZON, weather=None, holiday=None):
+    # Prakiraan casual, registered, dan cnt untuk horizon hari setelah last_date
+    dates, X = _future_features(model.normals, last_date, horizon, weather, holiday)
+    predicted = predict(X, model.coef)
+    result = pd.DataFrame(predicted, columns=TARGETS)
+    result.insert(0, 'date', dates)
+    return result
+
+
+def forecast_stations(models, last_date, horizon=DEFAULT_HORIZON):
+    # Prakiraan untuk banyak stasiun sekaligus: (stasiun, horizon, p) @
+    # (stasiun, p, target) dalam satu batched matmul. Mengembalikan tanggal dan
+    # array (stasiun, horizon, target).
+    coef = np.stack([model.coef for model in models])
+    normals = np.stack([model.normals for model in models])
+    dates, X = _future_features(normals, last_date, horizon)
+    return dates, predict(X, coef)
+
+
+def backtest(rows, horizon=DEFAULT_HORIZON, step=7, min_train=None, alpha=DEFAULT_ALPHA):
+    # Backtest rolling-origin: untuk setiap origin, model di-fit dengan data
+    # sebelum origin lalu memprakirakan horizon hari berikutnya. Cuaca aktual
+    # dipakai sebagai input, sehingga yang diukur adalah galat model, bukan
+    # galat prakiraan cuaca. Gram X'X dan X'Y kumulatif dihitung sekali, lalu
+    # semua origin di-fit dalam satu batched solve.
+    dates, X, Y = training_data(rows)
+    n = len(X)
+    if min_train is None:
+        min_train = max(2 * len(FEATURE_NAMES), min(365, n // 2))
+    origins = np.arange(min_train, n - horizon + 1, step)
+    if not len(origins):
+        raise ValueError(f"Data terlalu pendek untuk backtest dengan horizon {horizon} hari")
+
+    gram = np.cumsum(np.einsum('ni,nj->nij', X, X), axis=0)[origins - 1]
+    moment = np.cumsum(np.einsum('ni,nk->nik', X, Y), axis=0)[origins - 1]
+    coef = np.linalg.solve(gram + _penalty(alpha), moment)
+    window = origins[:, None] + np.arange(horizon)
+    errors = np.abs(predict(X[window], coef) - Y[window])
+
+    result = pd.DataFrame({'origin': dates[origins]})
+    for i, target in enumerate(TARGETS):
+        result[f'{target}_mae'] = errors[..., i].mean(axis=1)
+    # Weighted absolute percentage error: tetap terdefinisi pada hari dengan cnt mendekati nol
+    result['cnt_wape'] = errors[..., -1].sum(axis=1) / Y[window][..., -1].sum(axis=1) * 100
+    return result
+
+
+def _partition_model(csv_path, granularity, alpha):
+    # Dijalankan di proses worker; koefisien dibaca dari disk jika CSV tidak berubah
+    return load_model(csv_path, granularity, alpha), load_frames(csv_path, granularity).daily['date'].iloc[-1]
+
+
+def _partition_backtest(csv_path, granularity, horizon, step, alpha):
+    result = backtest(load_frames(csv_path, granularity).daily, horizon, step, alpha=alpha)
+    result.insert(0, 'source', csv_path)
+    return result
+
+
+def forecast_partitions(paths, granularity='daily', horizon=DEFAULT_HORIZON, alpha=DEFAULT_ALPHA, workers=None):
+    # Model per partisi dimuat di process pool, lalu seluruh partisi
+    # diprakirakan dengan satu batched matmul mulai dari tanggal terakhir data
+    models, last_dates = zip(*map_partitions(_partition_model, paths, granularity, alpha, workers=workers))
+    dates, predicted = forecast_stations(models, max(last_dates), horizon)
+    return pd.concat(
+        [pd.DataFrame(values, columns=TARGETS).assign(source=path, date=dates) for path, values in zip(paths, predicted)],
+        ignore_index=True,
+    )[['source', 'date'] + TARGETS]
+
+
+def backtest_partitions(paths, granularity='daily', horizon=DEFAULT_HORIZON, step=7, alpha=DEFAULT_ALPHA, workers=None):
+    results = map_partitions(_partition_backtest, paths, granularity, horizon, step, alpha, workers=workers)
+    return pd.concat(results, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prakiraan permintaan peminjaman sepeda dan backtest-nya")
+    parser.add_argument('--granularity', choices=['daily', 'hourly'], default='daily')
+    parser.add_argument('--data-dir', help="direktori berisi banyak file partisi day*.csv/hour*.csv")
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help="jumlah hari yang diprakirakan")
+    parser.add_argument('--step', type=int, default=7, help="jarak antar origin backtest (hari)")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help="kekuatan regularisasi ridge")
+    parser.add_argument('--workers', type=int, help="jumlah proses worker (default: jumlah CPU)")
+    args = parser.parse_args()
+
+    # Fungsi worker harus berasal dari modul forecast, bukan __main__ (lihat
+    # partitions.map_partitions), sehingga modul ini diimpor ulang dengan namanya
+    import forecast
+    from analytics import find_csv
+
+    if args.data_dir:
+        paths = find_partitions(args.data_dir, args.granularity)
+    else:
+        paths = [find_csv("hour.csv" if args.granularity == 'hourly' else "day.csv")]
+    options = dict(granularity=args.granularity, horizon=args.horizon, alpha=args.alpha, workers=args.workers)
+
+    scores = forecast.backtest_partitions(paths, step=args.step, **options)
+    print(f"Backtest rolling-origin ({args.horizon} hari, origin setiap {args.step} hari):")
+    print(scores.groupby('source', sort=False).mean(numeric_only=True).round(1).to_string())
+
+    predicted = forecast.forecast_partitions(paths, **options)
+    print(f"\nPrakiraan {args.horizon} hari ke depan (total semua partisi):")
+    print(predicted.groupby('date')[TARGETS].sum().round().astype('int64').to_string())
+
+
+if __name__ == '__main__':
+    main()
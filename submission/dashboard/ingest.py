@@ -0,0 +1,225 @@
+import hashlib
+import os
+
+import pandas as pd
+
+# Tipe data ringkas untuk hour.csv: kode kategori cukup int8, jumlah per jam
+# cukup int16, dan variabel cuaca cukup float32
+HOUR_DTYPES = {
+    'instant': 'int32',
+    'season': 'int8',
+    'yr': 'int8',
+    'mnth': 'int8',
+    'hr': 'int8',
+    'holiday': 'int8',
+    'weekday': 'int8',
+    'workingday': 'int8',
+    'weathersit': 'int8',
+    'temp': 'float32',
+    'atemp': 'float32',
+    'hum': 'float32',
+    'windspeed': 'float32',
+    'casual': 'int16',
+    'registered': 'int16',
+    'cnt': 'int16',
+}
+
+# Tipe data ringkas untuk day.csv; jumlah harian membutuhkan int32
+DAY_DTYPES = {col: dtype for col, dtype in HOUR_DTYPES.items() if col != 'hr'}
+DAY_DTYPES.update({'casual': 'int32', 'registered': 'int32', 'cnt': 'int32'})
+
+CALENDAR_COLS = ['season', 'yr', 'mnth', 'holiday', 'weekday', 'workingday']
+WEATHER_COLS = ['temp', 'atemp', 'hum', 'windspeed']
+COUNT_COLS = ['casual', 'registered', 'cnt']
+
+
+def _partial_daily(chunk):
+    # Agregat parsial per tanggal untuk satu chunk; satu hari bisa terpotong di
+    # antara dua chunk, jadi yang disimpan adalah jumlah dan banyaknya jam
+    grouped = chunk.groupby('date', sort=False)
+    partial = grouped[CALENDAR_COLS].first()
+    partial[WEATHER_COLS] = grouped[WEATHER_COLS].sum().astype('float64')
+    partial[COUNT_COLS] = grouped[COUNT_COLS].sum().astype('int32')
+    partial['hours'] = grouped.size()
+    weather_hours = pd.crosstab(chunk['date'], chunk['weathersit'])
+    return partial, weather_hours
+
+
+def _combine_daily(partials, weather_hours):
+    combined = pd.concat(partials)
+    grouped = combined.groupby(level='date', sort=True)
+    daily = grouped[CALENDAR_COLS].first()
+    hours = grouped['hours'].sum()
+    daily[WEATHER_COLS] = grouped[WEATHER_COLS].sum().div(hours, axis=0).astype('float32')
+    daily[COUNT_COLS] = grouped[COUNT_COLS].sum()
+
+    # Kondisi cuaca harian = kondisi yang paling lama terjadi dalam hari tersebut
+    weather_hours = pd.concat(weather_hours).fillna(0).groupby(level=0).sum()
+    daily['weathersit'] = weather_hours.idxmax(axis=1).reindex(daily.index).astype('int8')
+
+    daily = daily.reset_index()
+    daily['instant'] = pd.Series(range(1, len(daily) + 1), dtype='int32')
+    return daily[['instant', 'date'] + CALENDAR_COLS + ['weathersit'] + WEATHER_COLS + COUNT_COLS]
+
+
+def complete_size(csv_path):
+    # Posisi byte setelah baris lengkap terakhir. Baris yang sedang ditulis
+    # (belum diakhiri newline) baru dibaca pada pemuatan berikutnya.
+    with open(csv_path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b'\n')
+            if newline >= 0:
+                return pos - step + newline + 1
+            pos -= step
+    return 0
+
+
+def prefix_digest(csv_path, end, start=0, digest=None, chunk_size=1024 * 1024):
+    # State hash SHA-1 untuk seluruh byte [0, end). Jika hash byte lama berubah,
+    # isi lama file sudah diubah (bukan sekadar ditambah) sehingga data harus
+    # dimuat ulang penuh. Seluruh prefix di-hash karena perubahan di tengah file
+    # (misalnya satu angka diganti tanpa mengubah ukuran file) tidak terlihat
+    # dari beberapa byte terakhir saja. digest adalah state untuk byte
+    # [0, start) yang sudah diverifikasi (tidak diubah; yang diperbarui
+    # salinannya), sehingga hanya byte [start, end) yang dibaca. Tanpa digest,
+    # start harus 0.
+    digest = hashlib.sha1() if digest is None else digest.copy()
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            digest.update(data)
+            remaining -= len(data)
+    return digest
+
+
+class _RangeReader:
+    # Objek file yang hanya mengembalikan byte sampai posisi end
+    def __init__(self, f, end):
+        self._f = f
+        self._remaining = end - f.tell()
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.read().splitlines(keepends=True))
+
+
+def read_range(csv_path, dtypes, start=0, end=None, chunksize=None):
+    # Membaca baris CSV pada rentang byte [start, end). start=0 berarti dari awal
+    # file; start > 0 harus berada di awal baris (misalnya offset pemuatan
+    # sebelumnya), dan nama kolom diambil dari header file.
+    # Mengembalikan DataFrame, atau iterator chunk jika chunksize diberikan.
+    if end is None:
+        end = complete_size(csv_path)
+    if chunksize is None:
+        with open(csv_path, 'rb') as f:
+            return _parse_dates(_range_csv(f, dtypes, start, end))
+    return _range_chunks(csv_path, dtypes, start, end, chunksize)
+
+
+def _range_csv(f, dtypes, start, end, chunksize=None):
+    header = f.readline().decode().strip().split(',')
+    if start > 0:
+        f.seek(start)
+    return pd.read_csv(
+        _RangeReader(f, end),
+        names=header,
+        header=None,
+        dtype=dtypes,
+        usecols=['dteday'] + list(dtypes),
+        chunksize=chunksize,
+    )
+
+
+def _range_chunks(csv_path, dtypes, start, end, chunksize):
+    # File dibuka saat chunk pertama diminta dan selalu ditutup, termasuk jika
+    # pd.read_csv gagal atau iterasi dihentikan di tengah jalan
+    with open(csv_path, 'rb') as f, _range_csv(f, dtypes, start, end, chunksize) as reader:
+        for chunk in reader:
+            yield _parse_dates(chunk)
+
+
+def _parse_dates(chunk):
+    chunk['date'] = pd.to_datetime(chunk.pop('dteday'), format='%Y-%m-%d')
+    return chunk
+
+
+def rollup_daily(hour_df):
+    # Total harian dari baris per jam yang sudah ada di memori
+    partial, weather_hours = _partial_daily(hour_df)
+    return _combine_daily([partial], [weather_hours])
+
+
+def read_hourly(csv_path, start=0, end=None, chunksize=100_000):
+    # Membaca hour.csv per chunk dengan tipe data ringkas, sekaligus
+    # menghitung total harian dalam satu kali baca
+    hour_chunks, partials, weather_hours = [], [], []
+    for chunk in read_range(csv_path, HOUR_DTYPES, start, end, chunksize=chunksize):
+        partial, hours = _partial_daily(chunk)
+        partials.append(partial)
+        weather_hours.append(hours)
+        hour_chunks.append(chunk)
+
+    hour_df = pd.concat(hour_chunks, ignore_index=True)
+    daily_df = _combine_daily(partials, weather_hours)
+    return hour_df, daily_df
+
+
+def read_daily(csv_path, start=0, end=None):
+    # Membaca day.csv dengan tipe data ringkas dan kolom tanggal yang sudah di-parse
+    return read_range(csv_path, DAY_DTYPES, start, end)
+
+
+class OutOfOrderError(ValueError):
+    # Data baru berisi tanggal sebelum hari terakhir yang sudah dimuat
+    pass
+
+
+def check_order(df, new_df):
+    if len(df) and new_df['date'].min() < df['date'].iloc[-1]:
+        raise OutOfOrderError("Data baru harus berurutan waktu setelah data yang sudah dimuat")
+
+
+def append_daily(day_df, new_df):
+    # Menambahkan baris harian baru; hari terakhir yang muncul lagi diganti
+    # oleh versi barunya
+    if new_df.empty:
+        return day_df
+    check_order(day_df, new_df)
+    cut = day_df['date'].searchsorted(new_df['date'].min())
+    return pd.concat([day_df.iloc[:cut], new_df], ignore_index=True)
+
+
+def touched_hours(hour_df, new_hours):
+    # Baris per jam dari semua hari yang tersentuh data baru: jam-jam lama pada
+    # hari yang sama (hari terakhir bisa baru sebagian dimuat) ditambah data baru
+    check_order(hour_df, new_hours)
+    start = new_hours['date'].min()
+    return pd.concat([hour_df.iloc[hour_df['date'].searchsorted(start):], new_hours], ignore_index=True)
+
+
+def append_hourly(hour_df, daily_df, new_hours):
+    # Menambahkan baris per jam baru; total harian hanya dihitung ulang untuk
+    # hari-hari yang tersentuh data baru
+    if new_hours.empty:
+        return hour_df, daily_df
+    touched = touched_hours(hour_df, new_hours)
+    day_cut = daily_df['date'].searchsorted(new_hours['date'].min())
+    new_daily = rollup_daily(touched)
+    new_daily['instant'] = (new_daily['instant'] + day_cut).astype('int32')
+    return (
+        pd.concat([hour_df, new_hours], ignore_index=True),
+        pd.concat([daily_df.iloc[:day_cut], new_daily], ignore_index=True),
+    )
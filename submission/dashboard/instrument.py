@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("dashboard.perf")
+
+# tracemalloc berlaku untuk seluruh proses, sedangkan mode debug dipilih per
+# sesi. Tracing tetap aktif selama masih ada sesi yang mode debugnya menyala;
+# sesi yang ditutup saat debug masih aktif membuat tracing tetap menyala.
+_tracing_sessions = set()
+_tracing_lock = threading.Lock()
+
+
+def enable_logging():
+    # Setiap span dicatat sebagai satu baris JSON di stderr
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def _rss_bytes():
+    # RSS saat ini dari /proc (Linux); None jika tidak tersedia
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _track_tracing(session, enabled):
+    with _tracing_lock:
+        if enabled:
+            _tracing_sessions.add(session)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        elif session in _tracing_sessions:
+            _tracing_sessions.discard(session)
+            # tracemalloc memperlambat alokasi; dimatikan setelah sesi debug terakhir selesai
+            if not _tracing_sessions and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Profiler:
+    # Mengukur span bernama (waktu, memori, jumlah baris) dalam satu rerun.
+    # Jika tidak aktif, span() tidak melakukan apa-apa sehingga overhead-nya nol.
+    # session mengidentifikasi sesi pengguna (lihat _tracing_sessions). Memori
+    # (tracemalloc dan RSS) diukur untuk seluruh proses, sehingga ikut mencakup
+    # alokasi sesi lain yang berjalan bersamaan.
+
+    def __init__(self, enabled=False, session=None):
+        self.enabled = enabled
+        self.spans = []
+        if enabled:
+            enable_logging()
+        _track_tracing(session, enabled)
+
+    @contextmanager
+    def span(self, name, rows=None, **attrs):
+        if not self.enabled:
+            yield {}
+            return
+
+        record = {"span": name, "rows": rows, **attrs}
+        rss_before = _rss_bytes()
+        peak_rss_before = _peak_rss_bytes()
+        alloc_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            alloc_after, alloc_peak = tracemalloc.get_traced_memory()
+            record["alloc_peak_bytes"] = max(alloc_peak - alloc_before, 0)
+            record["alloc_net_bytes"] = alloc_after - alloc_before
+            rss_after = _rss_bytes()
+            record["rss_bytes"] = rss_after
+            record["rss_delta_bytes"] = None if rss_before is None else rss_after - rss_before
+            peak_rss_after = _peak_rss_bytes()
+            record["peak_rss_growth_bytes"] = None if peak_rss_before is None else peak_rss_after - peak_rss_before
+            self.spans.append(record)
+            logger.info(json.dumps(record, default=str))
+
+    def total_seconds(self):
+        return sum(record["seconds"] for record in self.spans)
+
+    def to_openmetrics(self):
+        # Format teks OpenMetrics; satu metrik summary per kolom, dengan label
+        # span. Nama span bisa muncul berkali-kali dalam satu rerun (misalnya
+        # import_plotting pada setiap cache miss), sehingga record dengan nama
+        # yang sama digabung menjadi satu deret _sum dan _count.
+        metrics = [
+            ("dashboard_span_seconds", "seconds", "Waktu eksekusi span"),
+            ("dashboard_span_alloc_peak_bytes", "alloc_peak_bytes", "Puncak alokasi Python seluruh proses (tracemalloc) selama span"),
+            ("dashboard_span_rss_delta_bytes", "rss_delta_bytes", "Perubahan RSS seluruh proses (semua sesi) selama span"),
+            ("dashboard_span_rows", "rows", "Jumlah baris yang diproses span"),
+        ]
+        lines = []
+        for metric, field, help_text in metrics:
+            lines.append(f"# TYPE {metric} summary")
+            lines.append(f"# HELP {metric} {help_text}")
+            totals = {}
+            for record in self.spans:
+                value = record.get(field)
+                if value is None:
+                    continue
+                total, count = totals.get(record["span"], (0, 0))
+                totals[record["span"]] = (total + value, count + 1)
+            for name, (total, count) in totals.items():
+                span = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}_sum{{span="{span}"}} {total}')
+                lines.append(f'{metric}_count{{span="{span}"}} {count}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,136 @@
+"""Laporan latensi startup dan rerun dashboard.
+
+dashboard.py dijalankan secara headless (streamlit.testing), dan setiap
+pengukuran memakai proses Python baru agar biaya impor ikut terukur:
+
+    cold start    run pertama di proses baru (impor, muat data, render)
+    warm rerun    rerun berikutnya tanpa perubahan widget (median)
+    ubah filter   rerun setelah filter musim diubah dan diterapkan (gambar
+                  untuk state filter baru dirender)
+
+Mode 'eager' mengimpor matplotlib.pyplot dan seaborn sebelum skrip berjalan,
+sama seperti dashboard.py saat keduanya masih diimpor di awal modul; mode
+'lazy' menjalankan dashboard.py apa adanya. Kedua mode diukur dengan cache
+gambar kosong dan dengan cache bersama yang sudah terisi (seperti setelah
+prewarm.py).
+
+Contoh:
+    python latency.py --repeat 3 --output latency.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from cachestore import CACHE_URL_ENV
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PLOTTING_MODULES = ('matplotlib.pyplot', 'seaborn')
+
+
+def measure(mode, reruns=5, timeout=300):
+    # Dijalankan di proses anak. Impor streamlit tidak ikut diukur karena pada
+    # server Streamlit sudah dimuat sebelum skrip dashboard dijalankan.
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(BASE_DIR, "dashboard.py"), default_timeout=timeout)
+    start = time.perf_counter()
+    if mode == 'eager':
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot  # noqa: F401
+        import seaborn  # noqa: F401
+    app.run()
+    cold = time.perf_counter() - start
+    plotting_after_cold = all(name in sys.modules for name in PLOTTING_MODULES)
+
+    warm = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        warm.append(time.perf_counter() - start)
+
+    # Satu musim dikeluarkan dari filter lalu diterapkan lewat tombol form
+    # (mode "Terapkan filter sekaligus" aktif secara default)
+    seasons = next(widget for widget in app.multiselect if widget.label == "Pilih Musim")
+    seasons.set_value(seasons.value[1:])
+    apply_button = next(widget for widget in app.button if widget.label == "Terapkan Filter")
+    start = time.perf_counter()
+    apply_button.click().run()
+    changed = time.perf_counter() - start
+
+    errors = [element.value for element in list(app.exception) + list(app.error)]
+    if errors:
+        raise RuntimeError(f"Dashboard gagal dirender: {errors[0]}")
+    return {
+        'cold_start': cold,
+        'warm_rerun': statistics.median(warm),
+        'filter_rerun': changed,
+        'plotting_imported_at_start': plotting_after_cold,
+    }
+
+
+def run_child(mode, cache_url=None):
+    env = dict(os.environ)
+    env.pop(CACHE_URL_ENV, None)
+    if cache_url:
+        env[CACHE_URL_ENV] = cache_url
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode],
+        env=env,
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(repeat=3):
+    # Median dari beberapa proses baru per skenario
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_url = f"file://{cache_dir}"
+        # Mengisi cache bersama untuk tampilan default
+        run_child('lazy', cache_url)
+        for cache_label, url in [("kosong", None), ("terisi", cache_url)]:
+            for mode in ('eager', 'lazy'):
+                runs = [run_child(mode, url) for _ in range(repeat)]
+                result = {'mode': mode, 'cache': cache_label}
+                for key in ('cold_start', 'warm_rerun', 'filter_rerun'):
+                    result[key] = statistics.median(run[key] for run in runs)
+                result['plotting_imported_at_start'] = runs[-1]['plotting_imported_at_start']
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mengukur latensi startup dan rerun dashboard")
+    parser.add_argument('--repeat', type=int, default=3, help="jumlah proses baru per skenario")
+    parser.add_argument('--output', help="file JSON untuk hasil pengukuran")
+    parser.add_argument('--child', choices=['eager', 'lazy'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return
+
+    results = report(args.repeat)
+    print(f"{'mode':<6} {'cache':<7} {'cold start':>11} {'warm rerun':>11} {'ubah filter':>12}  plotting dimuat saat start")
+    for result in results:
+        print(
+            f"{result['mode']:<6} {result['cache']:<7} "
+            f"{result['cold_start'] * 1000:8.0f} ms {result['warm_rerun'] * 1000:8.0f} ms "
+            f"{result['filter_rerun'] * 1000:9.0f} ms  {'ya' if result['plotting_imported_at_start'] else 'tidak'}"
+        )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
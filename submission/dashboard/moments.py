@@ -0,0 +1,106 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Variabel yang momennya disimpan pada setiap sel kubus harian: cuaca, jumlah
+# peminjaman, dan rasio pengguna casual
+MOMENT_COLS = ['temp', 'atemp', 'hum', 'windspeed', 'casual', 'registered', 'cnt', 'casual_ratio']
+
+
+def mean_col(col):
+    return f'{col}_mean'
+
+
+def m2_col(a, b):
+    # Co-moment terpusat: jumlah (a - mean_a) * (b - mean_b) dalam satu sel.
+    # Hanya satu sisi matriks yang disimpan, mengikuti urutan MOMENT_COLS.
+    if MOMENT_COLS.index(a) > MOMENT_COLS.index(b):
+        a, b = b, a
+    return f'{a}_{b}_m2'
+
+
+def _pairs(columns):
+    return list(itertools.combinations_with_replacement(columns, 2))
+
+
+def moment_values(df):
+    # Nilai baris untuk MOMENT_COLS; casual_ratio dihitung dari casual / cnt,
+    # sehingga hanya dipakai untuk data harian (cnt selalu lebih dari nol)
+    values = df[[col for col in MOMENT_COLS if col != 'casual_ratio']].astype('float64')
+    values['casual_ratio'] = values['casual'] / values['cnt']
+    return values
+
+
+def bucket_moments(values, keys):
+    # Momen per kelompok baris: rata-rata dan co-moment terpusat setiap pasangan
+    # kolom. Dihitung terpusat (bukan jumlah kuadrat mentah) agar tetap stabil
+    # secara numerik ketika sel-sel digabung berulang kali.
+    columns = list(values.columns)
+    grouped = values.groupby(keys, sort=True, observed=True)
+    means = grouped.mean()
+    centered = values - grouped.transform('mean')
+    products = pd.DataFrame(
+        {m2_col(a, b): centered[a].to_numpy() * centered[b].to_numpy() for a, b in _pairs(columns)},
+        index=values.index,
+    )
+    m2 = products.groupby(keys, sort=True, observed=True).sum()
+    return means.rename(columns=mean_col).join(m2)
+
+
+def merge_moments(cells, by=None, columns=MOMENT_COLS):
+    # Menggabungkan momen dari banyak sel menjadi momen per kelompok `by` (atau
+    # satu kelompok jika by kosong), dengan rumus gabungan paralel (Chan dkk.):
+    #   mean = sum(n_i * mean_i) / n
+    #   M2   = sum(M2_i) + sum(n_i * (mean_a_i - mean_a) * (mean_b_i - mean_b))
+    # Sel bisa berasal dari filter apa pun, dari beberapa chunk, atau dari
+    # beberapa partisi data yang dihitung terpisah.
+    by = [by] if isinstance(by, str) else list(by or [])
+    keys = [cells[col] for col in by] if by else np.zeros(len(cells), dtype='int8')
+    n = cells['n'].to_numpy(dtype='float64')
+
+    weighted = pd.DataFrame({col: cells[mean_col(col)].to_numpy() * n for col in columns}, index=cells.index)
+    weighted['n'] = n
+    grouped = weighted.groupby(keys, sort=True)
+    totals = grouped.sum()
+
+    # Selisih rata-rata setiap sel terhadap rata-rata kelompoknya
+    row_totals = grouped.transform('sum')
+    delta = cells[[mean_col(col) for col in columns]].to_numpy() - row_totals[columns].to_numpy() / row_totals[['n']].to_numpy()
+    delta = dict(zip(columns, delta.T))
+
+    m2 = pd.DataFrame(
+        {m2_col(a, b): cells[m2_col(a, b)].to_numpy() + n * delta[a] * delta[b] for a, b in _pairs(columns)},
+        index=cells.index,
+    )
+    m2 = m2.groupby(keys, sort=True).sum()
+
+    result = totals[columns].div(totals['n'], axis=0).rename(columns=mean_col).join(m2)
+    result.insert(0, 'n', totals['n'])
+    if not by:
+        # Satu baris; berisi NaN jika tidak ada sel sama sekali
+        result = result.reset_index(drop=True).reindex([0])
+    return result
+
+
+def covariance(stats, columns):
+    # Matriks kovarians sampel dari satu baris hasil merge_moments
+    matrix = np.array([[stats[m2_col(a, b)] for b in columns] for a in columns], dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix = matrix / (stats['n'] - 1)
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def correlation(stats, columns):
+    # Matriks korelasi Pearson dari satu baris hasil merge_moments
+    cov = covariance(stats, columns).to_numpy()
+    scale = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix = cov / np.outer(scale, scale)
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def stddev(stats, col):
+    # Simpangan baku sampel dari hasil merge_moments (per kelompok)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(stats[m2_col(col, col)] / (stats['n'] - 1))
@@ -0,0 +1,89 @@
+import glob
+import hashlib
+import multiprocessing
+import os
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+
+import pandas as pd
+
+from columnar_cache import source_signature
+from cube import merge_cubes
+from features import derive_features
+from pipeline import load_frames
+
+# Pola nama file partisi di dalam direktori data, dicari secara rekursif,
+# misalnya data/stasiun_a/2011/day.csv atau data/day_2012_05.csv
+PARTITION_PATTERNS = {'daily': 'day*.csv', 'hourly': 'hour*.csv'}
+
+
+def find_partitions(data_dir, granularity='daily'):
+    pattern = os.path.join(data_dir, '**', PARTITION_PATTERNS[granularity])
+    paths = sorted(glob.glob(pattern, recursive=True))
+    if not paths:
+        raise FileNotFoundError(f"Tidak ada file {PARTITION_PATTERNS[granularity]} di {data_dir}!")
+    return paths
+
+
+def partitions_version(paths):
+    # Hash dari daftar file partisi beserta ukuran dan waktu modifikasinya
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(path.encode() + source_signature(path))
+    return digest.hexdigest()[:16]
+
+
+def partial_aggregate(csv_path, granularity):
+    # Dijalankan di proses worker: hasil antara satu partisi dibaca (atau
+    # dihitung lalu disimpan), lalu baris turunannya dihitung. Hanya baris
+    # harian dan kubus parsial yang dikirim balik ke proses utama.
+    stages = load_frames(csv_path, granularity)
+    return derive_features(stages.daily), stages.cube, stages.hour_cube
+
+
+@contextmanager
+def _without_main_module():
+    # Proses 'spawn' mengimpor ulang modul __main__ milik proses induk. Streamlit
+    # memasang dashboard.py sebagai __main__, sehingga tanpa ini setiap worker
+    # akan menjalankan seluruh skrip dashboard. Fungsi worker ada di modul ini,
+    # jadi __main__ cukup diganti modul kosong selama worker dibuat.
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+def map_partitions(func, paths, *args, workers=None):
+    # Menjalankan func(path, *args) untuk setiap partisi di process pool dan
+    # mengembalikan hasilnya sesuai urutan paths. Proses worker dibuat dengan
+    # 'spawn' agar aman dipanggil dari server Streamlit yang multi-thread (dan
+    # sama perilakunya di Windows). func harus fungsi tingkat modul yang bukan
+    # milik __main__.
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers == 1:
+        return [func(path, *args) for path in paths]
+    context = multiprocessing.get_context('spawn')
+    # Ribuan partisi kecil dikirim per kelompok agar overhead antarproses kecil
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        # Semua worker dibuat saat tugas dikirim oleh map()
+        with _without_main_module():
+            results = executor.map(func, paths, *(repeat(arg) for arg in args), chunksize=chunksize)
+        return list(results)
+
+
+def aggregate_partitions(paths, granularity='daily', workers=None):
+    # Satu tugas per partisi di process pool, lalu kubus parsial digabung
+    partials = map_partitions(partial_aggregate, paths, granularity, workers=workers)
+    rows, cubes, hour_cubes = zip(*partials)
+    # Baris diurutkan menurut tanggal; partisi stasiun yang berbeda bisa
+    # berisi tanggal yang sama
+    rows = pd.concat(rows, ignore_index=True).sort_values('date', kind='stable', ignore_index=True)
+    cube = merge_cubes(cubes)
+    hour_cube = None if granularity != 'hourly' else merge_cubes(hour_cubes, extra_keys=['hr'])
+    return rows, cube, hour_cube
@@ -0,0 +1,115 @@
+"""Pipeline data bersama untuk dashboard, api.py, dan notebook analisis.
+
+Tahapan untuk satu file CSV:
+    load       parsing CSV dengan tipe data ringkas (ingest.py)
+    clean      membuang baris duplikat persis
+    aggregate  kubus harian (dengan momen) dan kubus per jam (cube.py)
+    derive     kolom turunan untuk grafik tingkat baris (features.py)
+
+Hasil load, clean, dan aggregate disimpan sebagai file Feather di samping CSV
+(columnar_cache.py), sehingga notebook dan dashboard memakai hasil antara yang
+sama dan hanya proses pertama yang menghitungnya. Jika CSV hanya bertambah
+baris, cukup baris baru yang diproses. Tahap derive murah dan selalu dihitung
+ulang. Analisis dijalankan lewat fungsi di analytics.py, sehingga angka di
+notebook dan di dashboard berasal dari kode yang sama.
+
+Dari notebook (direktori submission):
+    import sys; sys.path.insert(0, 'dashboard')
+    import analytics
+    ds = analytics.load_dataset('daily')
+    analytics.monthly_means(ds)
+"""
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+
+from columnar_cache import Source, load_with_cache
+from cube import build_cube, replace_from
+from ingest import HOUR_DTYPES, append_daily, append_hourly, read_daily, read_hourly, read_range, rollup_daily
+
+
+@dataclass(frozen=True)
+class Stages:
+    # Hasil antara untuk satu file CSV; hourly dan hour_cube None untuk data harian
+    daily: pd.DataFrame
+    hourly: pd.DataFrame
+    cube: pd.DataFrame
+    hour_cube: pd.DataFrame
+    # Posisi baca dan fingerprint CSV yang tercakup hasil ini (columnar_cache.Source)
+    source: Source
+
+
+def clean(df, existing=None):
+    # Baris yang sama persis (misalnya baris yang terkirim dua kali) hanya
+    # dihitung sekali. existing: baris yang sudah dimuat pada tanggal yang sama,
+    # untuk data baru yang ditambahkan; baris yang sudah ada di sana dibuang.
+    if df.duplicated().any():
+        df = df.drop_duplicates(ignore_index=True)
+    if existing is not None and len(existing) and len(df):
+        known = df.merge(existing.drop_duplicates(), how='left', on=list(df.columns), indicator=True)['_merge'] == 'both'
+        if known.any():
+            df = df[~known.to_numpy()].reset_index(drop=True)
+    return df
+
+
+def _load_daily(csv_path, end):
+    day_df = clean(read_daily(csv_path, end=end))
+    return day_df, build_cube(day_df, moments=True)
+
+
+def _load_hourly(csv_path, end):
+    hour_df, daily_df = read_hourly(csv_path, end=end)
+    cleaned = clean(hour_df)
+    if cleaned is not hour_df:
+        # Total harian dihitung ulang tanpa jam duplikat
+        hour_df, daily_df = cleaned, rollup_daily(cleaned)
+    return hour_df, daily_df, build_cube(daily_df, moments=True), build_cube(hour_df, extra_keys=['hr'])
+
+
+def _append_daily(frames, csv_path, start, end):
+    # Baris baru ditambahkan ke hasil tersimpan; kubus hanya dihitung ulang
+    # untuk hari-hari yang tersentuh
+    day_df, cube = frames
+    new_df = clean(read_daily(csv_path, start, end))
+    if new_df.empty:
+        return frames
+    day_df = append_daily(day_df, new_df)
+    start_date = new_df['date'].min()
+    touched = day_df.iloc[day_df['date'].searchsorted(start_date):]
+    return day_df, replace_from(cube, start_date, build_cube(touched, moments=True))
+
+
+def _append_hourly(frames, csv_path, start, end):
+    hour_df, daily_df, cube, hour_cube = frames
+    new_hours = read_range(csv_path, HOUR_DTYPES, start, end)
+    if not new_hours.empty:
+        new_hours = clean(new_hours, existing=hour_df.iloc[hour_df['date'].searchsorted(new_hours['date'].min()):])
+    if new_hours.empty:
+        return frames
+    hour_df, daily_df = append_hourly(hour_df, daily_df, new_hours)
+    start_date = new_hours['date'].min()
+    touched_days = daily_df.iloc[daily_df['date'].searchsorted(start_date):]
+    touched_hours = hour_df.iloc[hour_df['date'].searchsorted(start_date):]
+    return (
+        hour_df,
+        daily_df,
+        replace_from(cube, start_date, build_cube(touched_days, moments=True)),
+        replace_from(hour_cube, start_date, build_cube(touched_hours, extra_keys=['hr'])),
+    )
+
+
+def load_frames(csv_path, granularity):
+    # Tahap load, clean, dan aggregate untuk satu file CSV lewat cache Feather
+    # di sampingnya (misalnya day.feather dan day_cube.feather)
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    if granularity == 'hourly':
+        (hour_df, daily_df, cube, hour_cube), source = load_with_cache(
+            csv_path,
+            _load_hourly,
+            [name, f"{name}_daily", f"{name}_cube", f"{name}_hour_cube"],
+            append=_append_hourly,
+        )
+        return Stages(daily_df, hour_df, cube, hour_cube, source)
+    (day_df, cube), source = load_with_cache(csv_path, _load_daily, [name, f"{name}_cube"], append=_append_daily)
+    return Stages(day_df, None, cube, None, source)
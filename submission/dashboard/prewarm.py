@@ -0,0 +1,126 @@
+"""Mengisi cache bersama sebelum pengunjung pertama datang, misalnya saat deploy.
+
+dashboard.py dijalankan secara headless (streamlit.testing) untuk tampilan
+default dan sejumlah preset filter, dengan semua tab dirender. Gambar tersimpan
+di store DASHBOARD_CACHE_URL dengan key yang sama persis dengan key yang dipakai
+dashboard. Hasil analisis untuk api.py juga dihitung dan disimpan.
+
+Menjalankan:
+    DASHBOARD_CACHE_URL=file:///var/cache/dashboard python prewarm.py
+    DASHBOARD_CACHE_URL=... python prewarm.py --granularity daily hourly --presets presets.json
+
+File preset berisi daftar objek JSON, misalnya:
+    [{"name": "musim panas, hari libur", "seasons": [2], "workingday": 0},
+     {"name": "jam sibuk", "granularity": "hourly", "hours": [7, 9]}]
+Kunci yang tidak diisi memakai nilai default dashboard.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from cachestore import CACHE_URL_ENV
+from features import SEASON_NAMES, WEATHER_NAMES, WORKING_DAY_NAMES
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GRANULARITY_LABELS = {'daily': "Harian", 'hourly': "Per Jam"}
+
+
+def default_presets():
+    # Tampilan default, setiap musim, setiap kondisi cuaca, dan setiap jenis hari.
+    # Pilihan "Semua" (None) sama dengan tampilan default sehingga dilewati.
+    presets = [{'name': "default"}]
+    presets += [{'name': f"musim: {name}", 'seasons': [code]} for code, name in SEASON_NAMES.items()]
+    presets += [{'name': f"cuaca: {name}", 'weathers': [code]} for code, name in WEATHER_NAMES.items()]
+    presets += [{'name': f"hari: {name}", 'workingday': code} for code, name in WORKING_DAY_NAMES.items() if code is not None]
+    return presets
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def render_preset(preset, granularity, timeout=300):
+    # Menjalankan dashboard dengan nilai widget sesuai preset (kode kategori,
+    # sama seperti opsi widget); semua tab dirender sehingga setiap grafik
+    # masuk ke cache gambar
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(BASE_DIR, "dashboard.py"), default_timeout=timeout)
+    app.run()
+    _widget(app.toggle, "Terapkan filter sekaligus").set_value(False)
+    _widget(app.checkbox, "Render hanya tab yang aktif").set_value(False)
+    _widget(app.radio, "Granularitas Data").set_value(GRANULARITY_LABELS[granularity])
+    app.run()
+
+    if 'start_date' in preset or 'end_date' in preset:
+        start, end = _widget(app.date_input, "Rentang Tanggal").value
+        _widget(app.date_input, "Rentang Tanggal").set_value((
+            preset.get('start_date', start.isoformat()),
+            preset.get('end_date', end.isoformat()),
+        ))
+    if 'seasons' in preset:
+        _widget(app.multiselect, "Pilih Musim").set_value(preset['seasons'])
+    if 'weathers' in preset:
+        _widget(app.multiselect, "Pilih Kondisi Cuaca").set_value(preset['weathers'])
+    if 'workingday' in preset:
+        _widget(app.radio, "Status Hari").set_value(list(WORKING_DAY_NAMES).index(preset['workingday']))
+    if 'hours' in preset and granularity == 'hourly':
+        _widget(app.slider, "Rentang Jam").set_value(tuple(preset['hours']))
+    app.run()
+
+    errors = [element.value for element in list(app.exception) + list(app.error)]
+    if errors:
+        raise RuntimeError(f"Preset {preset['name']!r} gagal dirender: {errors[0]}")
+
+
+def warm_api(preset, granularity):
+    # Hasil semua analisis api.py untuk filter preset
+    import analytics
+    import api
+
+    spec = analytics.FilterSpec(
+        start_date=preset.get('start_date'),
+        end_date=preset.get('end_date'),
+        seasons=tuple(preset.get('seasons', ())),
+        weathers=tuple(preset.get('weathers', ())),
+        workingday=preset.get('workingday'),
+        hours=tuple(preset['hours']) if 'hours' in preset else None,
+    )
+    for name in analytics.METRICS:
+        if name in analytics.HOURLY_METRICS and granularity != 'hourly':
+            continue
+        api.metric_response(name, granularity, spec)
+        if name == 'seasonal_segment':
+            api.metric_response(name, granularity, spec, user_type='registered')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mengisi cache bersama dashboard untuk tampilan default dan preset filter")
+    parser.add_argument('--granularity', nargs='+', choices=list(GRANULARITY_LABELS), default=['daily'])
+    parser.add_argument('--presets', help="file JSON berisi daftar preset (default: preset bawaan)")
+    parser.add_argument('--skip-api', action='store_true', help="hanya mengisi cache gambar dashboard")
+    args = parser.parse_args()
+
+    if not os.environ.get(CACHE_URL_ENV):
+        parser.error(f"{CACHE_URL_ENV} harus diisi dengan store bersama (direktori disk atau Redis)")
+
+    presets = default_presets()
+    if args.presets:
+        with open(args.presets) as f:
+            presets = json.load(f)
+
+    for granularity in args.granularity:
+        for preset in presets:
+            if preset.get('granularity', granularity) != granularity:
+                continue
+            start = time.perf_counter()
+            render_preset(preset, granularity)
+            if not args.skip_api:
+                warm_api(preset, granularity)
+            print(f"[{granularity}] {preset['name']}: {time.perf_counter() - start:.1f} detik", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
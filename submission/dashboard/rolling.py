@@ -0,0 +1,189 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Faktor skala MAD agar sebanding dengan simpangan baku pada distribusi normal
+MAD_SCALE = 1.4826
+ANOMALY_METHODS = ['zscore', 'mad']
+
+
+def quantile_col(q):
+    # Nama kolom kuantil bergulir, misalnya q10 untuk kuantil 0.1
+    return f'q{round(q * 100):02d}'
+
+
+def rolling_mean_std(values, window, min_periods=None):
+    # Rata-rata dan simpangan baku (ddof=1) bergulir dalam O(n): selisih dua
+    # jumlah kumulatif. Nilai digeser dengan rata-ratanya lebih dulu agar
+    # jumlah kuadrat tidak kehilangan presisi pada deret panjang.
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    min_periods = window if min_periods is None else min_periods
+    shift = values.mean() if n else 0.0
+    centered = values - shift
+    sums = np.concatenate([[0.0], np.cumsum(centered)])
+    squares = np.concatenate([[0.0], np.cumsum(centered * centered)])
+    end = np.arange(1, n + 1)
+    start = np.maximum(end - window, 0)
+    count = end - start
+    total = sums[end] - sums[start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count + shift
+        var = np.maximum(squares[end] - squares[start] - total * total / count, 0.0) / (count - 1)
+    valid = count >= max(min_periods, 1)
+    mean[~valid] = np.nan
+    var[~(valid & (count > 1))] = np.nan
+    return mean, np.sqrt(var)
+
+
+def rolling_mad(values, window, min_periods=None, chunk_size=1 << 20):
+    # MAD bergulir: median(|x - median jendela|), dengan satu median yang sama
+    # untuk semua nilai di jendela tersebut. Jendela penuh diproses sebagai
+    # matriks (sliding_window_view, tanpa salinan) per potongan berisi sekitar
+    # chunk_size nilai, sehingga memori tetap terbatas. np.median memakai
+    # partisi (introselect), jadi biayanya O(n window) tanpa panggilan Python
+    # per baris.
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    min_periods = window if min_periods is None else min_periods
+    mad = np.full(n, np.nan)
+    # Jendela parsial di awal deret (hanya jika min_periods < window)
+    for end in range(max(min_periods, 1), min(window, n + 1)):
+        head = values[:end]
+        mad[end - 1] = np.median(np.abs(head - np.median(head)))
+    if n < window:
+        return mad
+    windows = sliding_window_view(values, window)
+    step = max(chunk_size // window, 1)
+    for start in range(0, len(windows), step):
+        chunk = windows[start:start + step]
+        median = np.median(chunk, axis=1, keepdims=True)
+        mad[window - 1 + start:window - 1 + start + len(chunk)] = np.median(np.abs(chunk - median), axis=1)
+    return mad
+
+
+def rolling_stats(values, window=28, quantiles=(0.1, 0.9), min_periods=None, mad=False):
+    # Statistik jendela bergulir (jendela berakhir pada baris itu sendiri).
+    # Rata-rata dan simpangan baku O(n); median dan kuantil memakai rolling
+    # pandas berbasis skiplist, O(n log window). MAD (kolom 'mad') hanya
+    # dihitung jika mad=True, karena biayanya O(n window) (lihat rolling_mad).
+    min_periods = window if min_periods is None else min_periods
+    mean, std = rolling_mean_std(values, window, min_periods)
+    series = pd.Series(np.asarray(values, dtype='float64'))
+    rolling = series.rolling(window, min_periods=min_periods)
+    median = rolling.median()
+    stats = {'mean': mean, 'std': std, 'median': median.to_numpy()}
+    for q in quantiles:
+        stats[quantile_col(q)] = rolling.quantile(q).to_numpy()
+    if mad:
+        stats['mad'] = rolling_mad(values, window, min_periods)
+    return pd.DataFrame(stats)
+
+
+def anomaly_scores(values, stats, method='zscore'):
+    # Skor setiap baris terhadap jendela sebelumnya (tanpa baris itu sendiri),
+    # sehingga lonjakan tidak ikut memperlebar patokannya. Mengembalikan
+    # (skor, patokan): patokan adalah rata-rata (zscore) atau median (mad)
+    # jendela sebelumnya.
+    values = np.asarray(values, dtype='float64')
+    previous = stats.shift(1)
+    if method not in ANOMALY_METHODS:
+        raise ValueError(f"Metode anomali tidak dikenal: {method}")
+    if method == 'mad':
+        baseline = previous['median'].to_numpy()
+        spread = MAD_SCALE * previous['mad'].to_numpy()
+    else:
+        baseline = previous['mean'].to_numpy()
+        spread = previous['std'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = (values - baseline) / spread
+    # Jendela yang nilainya semua sama (sebaran nol) tidak diberi skor
+    score[~np.isfinite(score)] = np.nan
+    return score, baseline
+
+
+def rolling_anomalies(values, window=28, method='zscore', threshold=3.0, quantiles=(0.1, 0.9), min_periods=None):
+    # Statistik bergulir, skor, dan penanda anomali (|skor| > threshold) untuk satu deret
+    if method not in ANOMALY_METHODS:
+        raise ValueError(f"Metode anomali tidak dikenal: {method}")
+    stats = rolling_stats(values, window, quantiles, min_periods, mad=method == 'mad')
+    stats['score'], stats['baseline'] = anomaly_scores(values, stats, method)
+    stats['anomaly'] = np.abs(np.nan_to_num(stats['score'])) > threshold
+    return stats
+
+
+def update_rolling_anomalies(previous, values, start, window=28, **options):
+    # Hasil rolling_anomalies untuk deret yang berubah mulai baris start (baris
+    # baru ditambahkan, atau hari terakhir diperbarui). Baris sebelum start
+    # dipakai apa adanya; yang dihitung ulang hanya baris sejak start beserta
+    # konteks window baris sebelumnya (jendela untuk patokan baris start), sehingga
+    # biayanya sebanding dengan jumlah baris baru.
+    context = max(start - window, 0)
+    tail = rolling_anomalies(np.asarray(values)[context:], window, **options).iloc[start - context:]
+    return pd.concat([previous.iloc[:start], tail], ignore_index=True)
+
+
+class LiveAnomalies:
+    # Deteksi anomali untuk tabel deret (kolom 'date' terurut dan kolom ukuran)
+    # yang terus bertambah. update() hanya menghitung ulang baris sejak baris
+    # pertama yang berubah dibanding pemanggilan sebelumnya; aman dipanggil dari
+    # beberapa thread sekaligus.
+
+    def __init__(self, columns, window=28, **options):
+        self.columns = list(columns)
+        self.window = window
+        self.options = options
+        self._frame = None
+        self._results = None
+        self._lock = threading.Lock()
+
+    def _changed_from(self, frame):
+        # Posisi baris pertama yang berbeda dari tabel sebelumnya
+        previous = self._frame
+        if previous is None:
+            return 0
+        common = min(len(previous), len(frame))
+        cols = ['date'] + self.columns
+        same = (previous[cols].iloc[:common].to_numpy() == frame[cols].iloc[:common].to_numpy()).all(axis=1)
+        changed = np.flatnonzero(~same)
+        return int(changed[0]) if len(changed) else common
+
+    def update(self, frame):
+        # Mengembalikan frame beserta kolom {ukuran}_{statistik} untuk setiap ukuran
+        with self._lock:
+            start = self._changed_from(frame)
+            if self._frame is not None and start == len(frame) == len(self._frame):
+                return self._result(frame)
+            results = {}
+            for col in self.columns:
+                values = frame[col].to_numpy()
+                if start == 0:
+                    results[col] = rolling_anomalies(values, self.window, **self.options)
+                else:
+                    results[col] = update_rolling_anomalies(self._results[col], values, start, self.window, **self.options)
+            self._frame = frame
+            self._results = results
+            return self._result(frame)
+
+    def _result(self, frame):
+        parts = [frame.reset_index(drop=True)]
+        parts += [self._results[col].add_prefix(f'{col}_') for col in self.columns]
+        return pd.concat(parts, axis=1)
+
+
+def anomaly_events(frame, columns):
+    # Daftar anomali format panjang dari hasil LiveAnomalies.update: satu baris
+    # per (tanggal, ukuran) yang ditandai, beserta patokan dan skornya
+    events = [
+        pd.DataFrame({
+            'date': frame['date'],
+            'measure': col,
+            'value': frame[col],
+            'baseline': frame[f'{col}_baseline'],
+            'score': frame[f'{col}_score'],
+        })[frame[f'{col}_anomaly'].to_numpy()]
+        for col in columns
+    ]
+    return pd.concat(events, ignore_index=True).sort_values(['date', 'measure'], ignore_index=True)
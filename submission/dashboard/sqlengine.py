@@ -0,0 +1,281 @@
+"""Engine DuckDB (opsional) untuk data yang lebih besar dari memori.
+
+Filter dan groupby dashboard dijalankan sebagai SQL langsung di atas file CSV
+atau Parquet oleh DuckDB (in-process, kolumnar, bisa memakai disk saat memori
+tidak cukup). Yang dikembalikan ke Python hanya kubus hasil filter dan baris
+harian, dengan kolom dan tipe yang sama seperti Dataset pandas, sehingga semua
+fungsi di analytics.py bekerja tanpa perubahan.
+
+Mengaktifkan (membutuhkan pip install duckdb):
+    DASHBOARD_ENGINE=duckdb streamlit run dashboard.py
+    DASHBOARD_ENGINE=duckdb DASHBOARD_DATA_DIR=/path/ke/data python api.py
+
+Membandingkan hasil kedua engine untuk semua analisis:
+    python sqlengine.py --granularity daily hourly --data-dir /path/ke/data
+    python sqlengine.py --filter "start_date=2012-01-01&seasons=2,3&workingday=1"
+"""
+import argparse
+import functools
+import glob
+import itertools
+import os
+import time
+from urllib.parse import parse_qs
+
+import duckdb
+import pandas as pd
+
+from cube import CUBE_KEYS, CUBE_MEASURES, with_calendar
+from features import derive_features
+from filters import FilterIndex
+from ingest import CALENDAR_COLS, COUNT_COLS, DAY_DTYPES, HOUR_DTYPES, WEATHER_COLS
+from moments import MOMENT_COLS, m2_col, mean_col
+from partitions import PARTITION_PATTERNS, partitions_version
+
+SQL_TYPES = {'int8': 'TINYINT', 'int16': 'SMALLINT', 'int32': 'INTEGER', 'float32': 'FLOAT'}
+
+
+def find_sources(data_dir, granularity='daily'):
+    # Seperti find_partitions, tetapi file Parquet dengan pola nama yang sama juga diambil
+    csv_pattern = PARTITION_PATTERNS[granularity]
+    paths = []
+    for pattern in (csv_pattern, csv_pattern.replace('.csv', '.parquet')):
+        paths += glob.glob(os.path.join(data_dir, '**', pattern), recursive=True)
+    if not paths:
+        raise FileNotFoundError(f"Tidak ada file {csv_pattern} atau Parquet di {data_dir}!")
+    return sorted(paths)
+
+
+def _literal(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _scan(paths, dtypes):
+    # Baris mentah dari semua file sebagai satu relasi; kolom filename dipakai
+    # untuk merangkum data per jam menjadi harian per file, seperti jalur pandas
+    def files(suffix):
+        return '[' + ', '.join(_literal(path) for path in paths if path.endswith(suffix)) + ']'
+
+    sources = []
+    if any(path.endswith('.csv') for path in paths):
+        types = ', '.join(f"{_literal(col)}: {_literal(SQL_TYPES[dtype])}" for col, dtype in dtypes.items())
+        sources.append(f"read_csv({files('.csv')}, header=true, filename=true, union_by_name=true, types={{{types}}})")
+    if any(path.endswith('.parquet') for path in paths):
+        sources.append(f"read_parquet({files('.parquet')}, filename=true, union_by_name=true)")
+    # Tipe kolom Parquet disamakan dengan tipe CSV
+    columns = ', '.join(f"CAST({col} AS {SQL_TYPES[dtype]}) AS {col}" for col, dtype in dtypes.items())
+    return ' UNION ALL '.join(
+        f"SELECT filename, CAST(dteday AS TIMESTAMP) AS date, {columns} FROM {source}" for source in sources
+    )
+
+
+def _daily_rollup():
+    # Padanan ingest.rollup_daily: kalender dari jam mana pun, cuaca rata-rata,
+    # jumlah peminjaman, dan kondisi cuaca yang paling lama terjadi (kode
+    # terkecil jika seri)
+    calendar = ', '.join(f"any_value({col}) AS {col}" for col in CALENDAR_COLS)
+    weather = ', '.join(f"CAST(avg({col}) AS FLOAT) AS {col}" for col in WEATHER_COLS)
+    counts = ', '.join(f"CAST(sum({col}) AS INTEGER) AS {col}" for col in COUNT_COLS)
+    return f"""
+        WITH weather_hours AS (
+            SELECT filename, date, weathersit, count(*) AS hours
+            FROM hours GROUP BY filename, date, weathersit
+        ), dominant AS (
+            SELECT filename, date, first(weathersit ORDER BY hours DESC, weathersit) AS weathersit
+            FROM weather_hours GROUP BY filename, date
+        ), totals AS (
+            SELECT filename, date, {calendar}, {weather}, {counts}
+            FROM hours GROUP BY filename, date
+        )
+        SELECT CAST(row_number() OVER (PARTITION BY filename ORDER BY date) AS INTEGER) AS instant, totals.*, dominant.weathersit
+        FROM totals JOIN dominant USING (filename, date)
+    """
+
+
+def _where(spec, hours=False):
+    clauses = []
+    params = []
+    if spec.start_date is not None:
+        clauses.append("date >= ?")
+        params.append(pd.Timestamp(spec.start_date).to_pydatetime())
+    if spec.end_date is not None:
+        clauses.append("date < ?")
+        params.append((pd.Timestamp(spec.end_date) + pd.Timedelta(days=1)).to_pydatetime())
+    for col, selected in (('season', spec.seasons), ('weathersit', spec.weathers)):
+        if selected:
+            clauses.append(f"{col} IN ({', '.join('?' * len(selected))})")
+            params += [int(code) for code in selected]
+    if spec.workingday is not None:
+        clauses.append("workingday = ?")
+        params.append(int(spec.workingday))
+    if hours and spec.hours is not None:
+        clauses.append("hr BETWEEN ? AND ?")
+        params += [int(spec.hours[0]), int(spec.hours[1])]
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class SqlDataset:
+    # Antarmuka yang sama dengan analytics.Dataset untuk analisis dan dashboard
+    # (rows, row_mask, filtered_rows, filtered_cube, filtered_hour_cube,
+    # version), tetapi kubus dihitung DuckDB dari file sumber pada setiap filter
+    # baru. File dibaca ulang saat dipakai, sehingga version mengikuti ukuran dan
+    # waktu modifikasi file, dan hasil yang disimpan ikut version tersebut.
+
+    def __init__(self, paths, granularity='daily'):
+        self.paths = list(paths)
+        self.source = None
+        self._hourly = granularity == 'hourly'
+        self._db = duckdb.connect()
+        if self._hourly:
+            self._db.execute(f"CREATE VIEW hours AS {_scan(self.paths, HOUR_DTYPES)}")
+            self._db.execute(f"CREATE VIEW days AS {_daily_rollup()}")
+        else:
+            self._db.execute(f"CREATE VIEW days AS {_scan(self.paths, DAY_DTYPES)}")
+        self._rows = None
+        self._cube = functools.lru_cache(maxsize=16)(self._query_cube)
+        self._hour_cube = functools.lru_cache(maxsize=16)(self._query_hour_cube)
+
+    @property
+    def hourly(self):
+        return self._hourly
+
+    @property
+    def version(self):
+        return partitions_version(self.paths)
+
+    def _query(self, sql, params=()):
+        # Cursor terpisah per query agar aman dipanggil dari beberapa thread
+        with self._db.cursor() as cursor:
+            return cursor.execute(sql, list(params)).df()
+
+    def _cast(self, df, dtypes):
+        return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+    def _indexed_rows(self):
+        # Baris harian (hasil rangkuman untuk data per jam) dengan kolom turunan
+        # dan indeks filternya; dimuat ulang saat file sumber berubah
+        version = self.version
+        if self._rows is None or self._rows[0] != version:
+            rows = self._query("SELECT * EXCLUDE (filename) FROM days ORDER BY date, filename")
+            rows = derive_features(self._cast(rows, DAY_DTYPES))
+            self._rows = version, rows, FilterIndex(rows)
+        return self._rows[1:]
+
+    @property
+    def rows(self):
+        return self._indexed_rows()[0]
+
+    def row_mask(self, spec):
+        return self._indexed_rows()[1].mask(**spec.mask_args())
+
+    def filtered_rows(self, spec):
+        return self.rows[self.row_mask(spec)]
+
+    def filtered_cube(self, spec):
+        return self._cube(spec, self.version)
+
+    def filtered_hour_cube(self, spec):
+        return self._hour_cube(spec, self.version)
+
+    def _query_cube(self, spec, version):
+        # Padanan build_cube(daily_df, moments=True) yang langsung difilter:
+        # jumlah, banyak hari, rata-rata, dan co-moment terpusat per sel.
+        # covar_pop * n sama dengan jumlah (a - mean_a) * (b - mean_b).
+        where, params = _where(spec)
+        sums = ', '.join(f"sum({m}) AS {m}_sum" for m in CUBE_MEASURES)
+        means = ', '.join(f"avg({col}) AS {mean_col(col)}" for col in MOMENT_COLS)
+        pairs = itertools.combinations_with_replacement(MOMENT_COLS, 2)
+        m2 = ', '.join(f"covar_pop({a}, {b}) * count(*) AS {m2_col(a, b)}" for a, b in pairs)
+        values = ', '.join(f"CAST({col} AS DOUBLE) AS {col}" for col in MOMENT_COLS if col != 'casual_ratio')
+        keys = ', '.join(CUBE_KEYS)
+        cube = self._query(f"""
+            SELECT {keys}, {sums}, count(*) AS n, {means}, {m2}
+            FROM (
+                SELECT {keys}, {values}, CAST(casual AS DOUBLE) / cnt AS casual_ratio
+                FROM days {where}
+            )
+            GROUP BY {keys} ORDER BY {keys}
+        """, params)
+        return with_calendar(self._cast(cube, self._cube_dtypes(DAY_DTYPES)))
+
+    def _query_hour_cube(self, spec, version):
+        # Padanan build_cube(hour_df, extra_keys=['hr']) yang langsung difilter
+        where, params = _where(spec, hours=True)
+        sums = ', '.join(f"sum({m}) AS {m}_sum" for m in CUBE_MEASURES)
+        keys = ', '.join(CUBE_KEYS + ['hr'])
+        cube = self._query(f"SELECT {keys}, {sums}, count(*) AS n FROM hours {where} GROUP BY {keys} ORDER BY {keys}", params)
+        return with_calendar(self._cast(cube, self._cube_dtypes(HOUR_DTYPES)))
+
+    def _cube_dtypes(self, dtypes):
+        result = {col: dtypes[col] for col in CUBE_KEYS[1:] + ['hr'] if col in dtypes}
+        result.update({f'{m}_sum': dtypes[m] for m in CUBE_MEASURES})
+        result['n'] = 'int64'
+        return result
+
+
+def load_sql_dataset(granularity='daily', data_dir=None):
+    # Sumber data sama seperti analytics.load_dataset: direktori partisi, atau
+    # day.csv/hour.csv di direktori dashboard/dataset
+    from analytics import find_csv
+
+    if data_dir:
+        paths = find_sources(data_dir, granularity)
+    else:
+        paths = [find_csv("hour.csv" if granularity == 'hourly' else "day.csv")]
+    return SqlDataset(paths, granularity)
+
+
+def compare_engines(granularity='daily', spec=None, data_dir=None, rtol=1e-6):
+    # Menjalankan setiap analisis dengan kedua engine dan membandingkan hasilnya.
+    # Mengembalikan daftar (nama, waktu pandas, waktu duckdb, pesan selisih atau None).
+    import analytics
+
+    spec = spec or analytics.ALL
+    pandas_ds = analytics.load_dataset(granularity, data_dir, engine='pandas')
+    sql_ds = load_sql_dataset(granularity, data_dir)
+    report = []
+    for name, metric in analytics.METRICS.items():
+        if name in analytics.HOURLY_METRICS and granularity != 'hourly':
+            continue
+        start = time.perf_counter()
+        expected = metric(pandas_ds, spec)
+        pandas_time = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = metric(sql_ds, spec)
+        sql_time = time.perf_counter() - start
+        try:
+            # Index baris asli tidak dibandingkan (filtered_rows memakai nomor baris)
+            pd.testing.assert_frame_equal(
+                actual.reset_index(drop=not any(actual.index.names)),
+                expected.reset_index(drop=not any(expected.index.names)),
+                rtol=rtol,
+            )
+            difference = None
+        except AssertionError as error:
+            difference = str(error).strip().splitlines()[0]
+        report.append((name, pandas_time, sql_time, difference))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Membandingkan hasil analisis engine pandas dan DuckDB")
+    parser.add_argument('--granularity', nargs='+', choices=['daily', 'hourly'], default=['daily'])
+    parser.add_argument('--data-dir', help="direktori berisi banyak file partisi CSV/Parquet")
+    parser.add_argument('--filter', default='', help="filter dengan format query string api.py")
+    args = parser.parse_args()
+
+    from analytics import FilterSpec
+    spec = FilterSpec.from_params({key: values[-1] for key, values in parse_qs(args.filter).items()})
+
+    failed = False
+    for granularity in args.granularity:
+        print(f"[{granularity}]")
+        for name, pandas_time, sql_time, difference in compare_engines(granularity, spec, args.data_dir):
+            status = "sama" if difference is None else f"BERBEDA: {difference}"
+            print(f"  {name:<26} pandas {pandas_time * 1000:7.1f} ms  duckdb {sql_time * 1000:7.1f} ms  {status}")
+            failed |= difference is not None
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from cachestore import DiskStore, MemoryStore, RedisStore, code_version, open_store
+
+
+class FakeRedis:
+    # Pengganti lokal untuk redis.Redis: hanya get() dan set() dengan TTL
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    def get(self, name):
+        if name in self.expiry and time.time() >= self.expiry[name]:
+            del self.values[name], self.expiry[name]
+        return self.values.get(name)
+
+    def set(self, name, value, ex=None, px=None):
+        for ttl in (ex, px):
+            if ttl is not None and (not isinstance(ttl, int) or ttl <= 0):
+                raise ValueError("invalid expire time in 'set' command")
+        self.values[name] = value
+        self.expiry.pop(name, None)
+        if ex is not None or px is not None:
+            self.expiry[name] = time.time() + (ex if ex is not None else px / 1000)
+
+
+def entry_files(directory):
+    return [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+
+
+def test_disk_store_round_trip_and_replace(tmp_path):
+    store = DiskStore(str(tmp_path))
+    assert store.get('a') is None
+    store.set('a', b'first')
+    store.set('a', b'second')
+    assert store.get('a') == b'second'
+    # Penulisan atomik tidak meninggalkan file sementara
+    assert not any(path.endswith('.tmp') for path in entry_files(tmp_path))
+
+
+def test_disk_store_ttl(tmp_path):
+    store = DiskStore(str(tmp_path), ttl=60)
+    store.set('old', b'x')
+    store.set('new', b'y')
+    path = store._path('old')
+    past = time.time() - 120
+    os.utime(path, (past, past))
+    assert store.get('old') is None
+    assert not os.path.exists(path)
+    assert store.get('new') == b'y'
+
+
+def test_disk_store_evicts_least_recently_used_to_90_percent(tmp_path):
+    store = DiskStore(str(tmp_path), max_bytes=1000)
+    for i in range(10):
+        store.set(f'k{i}', bytes(100))
+        # Waktu akses berurutan: k0 paling lama tidak dipakai
+        path = store._path(f'k{i}')
+        os.utime(path, (1000 + i, os.stat(path).st_mtime))
+    # k0 dibaca lagi sehingga menjadi yang terbaru
+    assert store.get('k0') is not None
+    store.set('k10', bytes(100))
+    store.evict()
+    assert sum(os.path.getsize(path) for path in entry_files(tmp_path)) <= 900
+    assert store.get('k0') is not None
+    assert store.get('k1') is None
+    assert store.get('k10') is not None
+
+
+def _write_and_read(directory, worker):
+    store = DiskStore(directory)
+    payloads = {bytes([i]) * 50_000 for i in range(4)}
+    for i in range(50):
+        store.set('shared', bytes([(worker + i) % 4]) * 50_000)
+        data = store.get('shared')
+        if data is not None and data not in payloads:
+            return False
+    return True
+
+
+def test_disk_store_shared_by_several_processes(tmp_path):
+    # Beberapa proses menulis key yang sama; pembaca tidak pernah melihat entri setengah jadi
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_write_and_read, [str(tmp_path)] * 4, range(4)))
+    assert all(results)
+    assert DiskStore(str(tmp_path)).get('shared') is not None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStore(max_bytes=300)
+    for key in 'abc':
+        store.set(key, bytes(100))
+    store.get('a')
+    store.set('d', bytes(100))
+    assert store.get('b') is None
+    assert store.get('a') is not None
+
+
+def test_redis_store_with_fake_client():
+    client = FakeRedis()
+    store = RedisStore(client, prefix='test:', ttl=0.2)
+    store.set('a', b'data')
+    assert client.values == {'test:a': b'data'}
+    assert store.get('a') == b'data'
+    time.sleep(0.25)
+    assert store.get('a') is None
+    RedisStore(client).set('b', b'data')
+    assert client.get('dashboard:b') == b'data'
+
+
+def test_invalid_ttl_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_store(f'{tmp_path}?ttl=0')
+    with pytest.raises(ValueError):
+        RedisStore(FakeRedis(), ttl=-1)
+
+
+def test_code_version_ignores_tests_and_cli_scripts(tmp_path):
+    (tmp_path / 'analytics.py').write_text('x = 1\n')
+    before = code_version(str(tmp_path))
+    (tmp_path / 'test_analytics.py').write_text('def test(): pass\n')
+    (tmp_path / 'latency.py').write_text('print()\n')
+    assert code_version(str(tmp_path)) == before
+    (tmp_path / 'analytics.py').write_text('x = 2\n')
+    assert code_version(str(tmp_path)) != before
@@ -0,0 +1,29 @@
+import tracemalloc
+
+from instrument import Profiler
+
+
+def test_tracing_stays_on_while_a_debug_session_is_active():
+    Profiler(enabled=True, session='a')
+    Profiler(enabled=False, session='b')
+    assert tracemalloc.is_tracing()
+    Profiler(enabled=True, session='b')
+    Profiler(enabled=False, session='a')
+    assert tracemalloc.is_tracing()
+    Profiler(enabled=False, session='b')
+    assert not tracemalloc.is_tracing()
+
+
+def test_openmetrics_aggregates_repeated_spans():
+    profiler = Profiler(enabled=True, session='metrics')
+    for rows in (10, 20):
+        with profiler.span("import_plotting", rows=rows):
+            pass
+    with profiler.span("filter", rows=5):
+        pass
+    Profiler(enabled=False, session='metrics')
+    lines = profiler.to_openmetrics().splitlines()
+    samples = [line.split(' ')[0] for line in lines if not line.startswith('#')]
+    assert len(samples) == len(set(samples))
+    assert 'dashboard_span_rows_sum{span="import_plotting"} 30' in lines
+    assert 'dashboard_span_rows_count{span="import_plotting"} 2' in lines
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from rolling import rolling_anomalies, rolling_mad, rolling_stats, update_rolling_anomalies
+
+
+def brute_force_mad(values, window, min_periods):
+    # MAD setiap jendela dihitung langsung: median(|x - median(jendela)|)
+    mad = np.full(len(values), np.nan)
+    for end in range(1, len(values) + 1):
+        w = values[max(end - window, 0):end]
+        if len(w) >= min_periods:
+            mad[end - 1] = np.median(np.abs(w - np.median(w)))
+    return mad
+
+
+def test_rolling_mad_matches_brute_force():
+    values = analytics.load_dataset().rows['cnt'].to_numpy(dtype='float64')
+    for window, min_periods in [(28, 28), (7, 3)]:
+        stats = rolling_stats(values, window, min_periods=min_periods, mad=True)
+        np.testing.assert_allclose(stats['mad'], brute_force_mad(values, window, min_periods), equal_nan=True)
+    # Potongan kecil memberi hasil yang sama dengan satu potongan besar
+    np.testing.assert_allclose(rolling_mad(values, 28, chunk_size=100), brute_force_mad(values, 28, 28), equal_nan=True)
+
+
+def test_mad_only_computed_for_mad_method():
+    values = np.arange(100, dtype='float64')
+    assert 'mad' not in rolling_anomalies(values, 28, method='zscore')
+    assert 'mad' in rolling_anomalies(values, 28, method='mad')
+
+
+def test_update_matches_full_recompute():
+    values = np.random.default_rng(0).poisson(500, 200).astype('float64')
+    values[150] = 2000
+    previous = rolling_anomalies(values[:120], 28, method='mad')
+    updated = update_rolling_anomalies(previous, values, 120, 28, method='mad')
+    pd.testing.assert_frame_equal(updated, rolling_anomalies(values, 28, method='mad'))
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        rolling_anomalies(np.arange(100, dtype='float64'), 28, method='iqr')
@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip('duckdb')
+
+from analytics import ALL, FilterSpec  # noqa: E402
+from sqlengine import compare_engines  # noqa: E402
+
+SPECS = [
+    ALL,
+    FilterSpec(start_date='2011-03-01', end_date='2012-06-30', seasons=(2, 3), weathers=(1, 2), workingday=1, hours=(7, 9)),
+]
+
+
+@pytest.mark.parametrize('granularity', ['daily', 'hourly'])
+@pytest.mark.parametrize('spec', SPECS, ids=['all', 'filtered'])
+def test_engines_agree(granularity, spec):
+    differences = [(name, difference) for name, _, _, difference in compare_engines(granularity, spec) if difference]
+    assert differences == []
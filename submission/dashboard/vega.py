@@ -0,0 +1,37 @@
+# Spesifikasi Vega-Lite untuk grafik yang dirender di sisi klien (browser).
+# Data yang dikirim sudah di-downsample sehingga ukuran payload tetap terbatas.
+
+BACKENDS = ["Matplotlib", "Vega-Lite"]
+
+
+def timeseries_spec(x, y, title, x_title, y_title, color):
+    return {
+        "title": title,
+        "width": "container",
+        "mark": {"type": "line", "color": color, "strokeWidth": 1},
+        "encoding": {
+            "x": {"field": x, "type": "temporal", "title": x_title},
+            "y": {"field": y, "type": "quantitative", "title": y_title},
+            "tooltip": [
+                {"field": x, "type": "temporal", "title": x_title},
+                {"field": y, "type": "quantitative", "title": y_title, "format": ",.2f"},
+            ],
+        },
+        # Zoom dan geser dengan mouse tanpa rerun di server
+        "params": [{"name": "zoom", "select": "interval", "bind": "scales"}],
+    }
+
+
+def anomaly_spec(x, y, flag, title, x_title, y_title, color):
+    # Grafik garis dengan titik anomali (baris dengan kolom flag bernilai true)
+    line = timeseries_spec(x, y, title, x_title, y_title, color)
+    points = {
+        "transform": [{"filter": f"datum['{flag}']"}],
+        "mark": {"type": "point", "color": "red", "filled": True, "size": 50},
+        "encoding": {key: line["encoding"][key] for key in ("x", "y", "tooltip")},
+    }
+    return {
+        "title": line.pop("title"),
+        "width": line.pop("width"),
+        "layer": [line, points],
+    }